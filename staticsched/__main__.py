@@ -0,0 +1,137 @@
+"""
+Headless command line interface:
+
+    python -m staticsched schedule saved/test1 saved/thor --links 3 --queue 3 --scheduler modelling
+    python -m staticsched sweep results.jsonl --workers 4
+    python -m staticsched benchmark run baseline.json
+
+Only the modules a command needs are imported, and never tkinter or matplotlib.
+"""
+import argparse
+import json
+import sys
+
+
+# QueueGenerationPolicy12 is left out: it returns the first character of every node id
+QUEUES = ["2", "3", "4", "16"]
+SCHEDULERS = ["advance", "modelling"]
+
+
+def load_graph(graph_class, path, override_node=None):
+    graph = graph_class()
+    with open(path) as graph_file:
+        graph_class.deserialize(graph, json.load(graph_file), override_node=override_node or {})
+    return graph
+
+
+def schedule(args):
+    from staticsched.graph_analytics import task_queues
+    from staticsched.graph_analytics.raw_graph import DAG, Graph
+    from staticsched.graph_analytics.scheduler.schedulers import AdvanceNeighbourScheduler, \
+        ModellingNeighbourScheduler
+    from staticsched.graph_analytics.system_template import SystemTemplate
+
+    schedulers = {
+        "advance": AdvanceNeighbourScheduler,
+        "modelling": ModellingNeighbourScheduler,
+    }
+    queue_policy = getattr(task_queues, "QueueGenerationPolicy" + args.queue)()
+
+    task_dag = load_graph(DAG, args.dag)
+    system_graph = load_graph(Graph, args.system, None if args.links is None else {"weight": args.links})
+    template = SystemTemplate(system_graph, duplex=not args.no_duplex, has_io_cpu=not args.no_io_cpu)
+
+    params = {"queue": args.queue, "scheduler": args.scheduler,
+              "duplex": not args.no_duplex, "io_cpu": not args.no_io_cpu}
+    tracer = None
+    if args.trace:
+        from staticsched.graph_analytics.trace import Tracer
+        tracer = Tracer()
+    stats = {}
+
+    def compute():
+        # only the modelling scheduler takes workers, main() rejects them for the others
+        kwargs = {"workers": args.workers} if args.workers else {}
+        scheduler = template.scheduler(schedulers[args.scheduler], task_dag, queue_policy,
+                                       collect_stats=args.stats, event_driven=True, tracer=tracer, **kwargs)
+        scheduler.schedule_dag()
+        system = scheduler._system
+        if args.stats:
+            stats.update(system.stats.as_dict())
+
+        return dict(system.placement(), makespan=system.duration())
+
+    if args.cache and not (args.stats or args.trace):
+        from staticsched.graph_analytics.result_cache import ResultCache, schedule_key
+        cache = ResultCache(args.cache, max_bytes=args.cache_size * 1024 * 1024)
+        scheduled = cache.get_or_compute(schedule_key(task_dag, system_graph, params), compute)
+    else:
+        scheduled = compute()
+
+    makespan = scheduled["makespan"]
+    speedup = task_dag.duration_on_one_cpu() / makespan if makespan else 0
+    result = {
+        "makespan": makespan,
+        "speedup": speedup,
+        "efficiency": speedup / len(system_graph.nodes),
+        "tasks": scheduled["tasks"],
+        "transmissions": scheduled["transmissions"],
+    }
+    print("makespan: {makespan}\nspeedup: {speedup:.4f}\nefficiency: {efficiency:.4f}".format(**result))
+
+    if args.stats:
+        result["stats"] = stats
+        print(json.dumps(stats, indent=2, sort_keys=True))
+    if args.trace:
+        tracer.write(args.trace)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+    return 0
+
+
+def sweep(args):
+    from staticsched.graph_analytics.sweep import main
+    return main(args)
+
+
+def benchmark(args):
+    from staticsched.graph_analytics.benchmark import main
+    return main(args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m staticsched", description="DAG scheduler")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    schedule_parser = commands.add_parser("schedule", help="schedules a DAG on a system")
+    schedule_parser.add_argument("dag", help="DAG JSON, as saved by the UI")
+    schedule_parser.add_argument("system", help="system graph JSON, as saved by the UI")
+    schedule_parser.add_argument("--links", type=int, default=None, help="overrides links count of every CPU")
+    schedule_parser.add_argument("--queue", choices=QUEUES, default="3")
+    schedule_parser.add_argument("--scheduler", choices=SCHEDULERS, default="advance")
+    schedule_parser.add_argument("--no-duplex", action="store_true")
+    schedule_parser.add_argument("--no-io-cpu", action="store_true")
+    schedule_parser.add_argument("--workers", type=int, default=0, help="parallel CPU trials (modelling)")
+    schedule_parser.add_argument("--output", help="writes the schedule as JSON")
+    schedule_parser.add_argument("--stats", action="store_true", help="prints scheduler counters and timers")
+    schedule_parser.add_argument("--trace", help="writes a Chrome trace-event JSON")
+    schedule_parser.add_argument("--cache", help="directory of cached schedules, skipped with --stats/--trace")
+    schedule_parser.add_argument("--cache-size", type=int, default=64, help="cache size limit, MB")
+
+    # the rest of the command line is handed over to the module
+    commands.add_parser("sweep", help="see python -m staticsched sweep -h", add_help=False)
+    commands.add_parser("benchmark", help="see python -m staticsched benchmark -h", add_help=False)
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command == "schedule":
+        if rest:
+            parser.error("unrecognized arguments: " + " ".join(rest))
+        if args.workers and args.scheduler != "modelling":
+            parser.error("--workers needs --scheduler modelling")
+        return schedule(args)
+    return {"sweep": sweep, "benchmark": benchmark}[args.command](rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
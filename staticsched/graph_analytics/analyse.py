@@ -1,3 +1,8 @@
+from collections.abc import Mapping
+from weakref import WeakKeyDictionary, ref
+from staticsched.graph_analytics.compact_graph import CompactDAG
+
+
 def _find_cycle_to_ancestor(spanning_tree, node, ancestor):
     path = []
     while node.n_id != ancestor.n_id:
@@ -48,47 +53,178 @@ def is_connected(graph):
     return len(visited) == len(nodes)
 
 
-def dfs_caching(graph, aggregator, transformator, forward):
-    def dfs(start_node):
-        if start_node.n_id in result:
-            return result[start_node.n_id]
-
-        if forward:
-            ways = [dfs(each) for each in graph.get_neighbours(start_node, forward=forward)]
-            way = aggregator(ways)
-            calculated = transformator(start_node, way)
-        else:
-            ways = [transformator(each, dfs(each)) for each in graph.get_neighbours(start_node, forward=forward)]
-            way = aggregator(ways)
-            calculated = way
-        result[node.n_id] = calculated
-        return calculated
-
-    result = {}
-    for node in graph.nodes.values():
-        result[node.n_id] = dfs(node)
-    return result
-
+def topological_order(graph):
+    """
+    Kahn's ordering of a CompactDAG, raises ValueError if the graph has a cycle
+    """
+    in_degree = [graph.pred_offsets[i + 1] - graph.pred_offsets[i] for i in range(len(graph))]
+    order = [i for i, degree in enumerate(in_degree) if degree == 0]
+    for i in order:
+        for j in graph.successors(i):
+            in_degree[j] -= 1
+            if in_degree[j] == 0:
+                order.append(j)
+    if len(order) < len(graph):
+        raise ValueError("Graph has a cycle, critical paths are undefined")
+    return order
+
+
+class CriticalPaths(Mapping):
+    """
+    Critical paths of every node as a read-only `n_id -> (length, path)` mapping.
+    Only the length and the best next node are stored per node, paths are
+    rebuilt on access by following the best nodes.
+
+    forward: path starts with the node and goes down to an exit node, length includes the node
+    backward: path starts with the node's best parent and goes up to an entry node,
+              length does not include the node itself
+    """
+    def __init__(self, graph, lengths, best):
+        self._graph = graph
+        self._lengths = lengths
+        self._best = best
+
+    def __getitem__(self, n_id):
+        return self.length(n_id), self.path(n_id)
+
+    def __iter__(self):
+        return iter(self._graph.node_ids)
+
+    def __len__(self):
+        return len(self._graph)
+
+    def length(self, n_id):
+        return self._lengths[self._graph.index[n_id]]
+
+    def path(self, n_id):
+        path = []
+        i = self._first(self._graph.index[n_id])
+        while i >= 0:
+            path.append(self._graph.node_ids[i])
+            i = self._best[i]
+        return path
+
+    def _first(self, i):
+        raise NotImplemented()
+
+    def max_length(self):
+        return max(self._lengths, default=0)
+
+    def critical(self):
+        """
+        The greatest (length, path) pair, same as max(self.values()),
+        but paths are only built for the nodes of maximum length
+        """
+        max_length = self.max_length()
+        return max((max_length, self.path(n_id))
+                   for n_id, length in zip(self._graph.node_ids, self._lengths)
+                   if length == max_length)
+
+
+class ForwardCriticalPaths(CriticalPaths):
+    def _first(self, i):
+        return i
+
+
+class BackwardCriticalPaths(CriticalPaths):
+    def _first(self, i):
+        return self._best[i]
+
+
+def _compute_critical_paths(graph: CompactDAG, forward, weight_based):
+    if weight_based:
+        costs = graph.weights
+    else:
+        costs = [1] * len(graph)
 
-def find_all_critical_paths(graph, forward, weight_based):
+    order = topological_order(graph)
+    lengths = [0] * len(graph)
+    best = [-1] * len(graph)
     if forward:
-        def aggregation(ways):
-            return max(ways, key=lambda x: x[0], default=(0, []))
+        # length of a node is its cost plus the longest of its children;
+        # the first child of maximal length wins, as in max()
+        for i in reversed(order):
+            best_length = 0
+            for j in graph.successors(i):
+                if best[i] < 0 or lengths[j] > best_length:
+                    best[i], best_length = j, lengths[j]
+            lengths[i] = best_length + costs[i]
+        return ForwardCriticalPaths(graph, lengths, best)
     else:
-        def aggregation(ways):
-            return max(ways, key=lambda x: x[0], default=(0, []))
+        # length of a node is the longest of (parent length + parent cost)
+        for i in order:
+            best_length = 0
+            for j in graph.predecessors(i):
+                length = lengths[j] + costs[j]
+                if best[i] < 0 or length > best_length:
+                    best[i], best_length = j, length
+            lengths[i] = best_length
+        return BackwardCriticalPaths(graph, lengths, best)
+
+
+class GraphAnalysis:
+    """
+    Analysis results of one graph. Every result is computed on first request
+    and kept until the graph's version changes (see GeneralGraph.touch)
+    """
+    def __init__(self, graph):
+        self._graph = ref(graph)
+        self._version = None
+        self._results = {}
+
+    def _cached(self, key, compute):
+        graph = self._graph()
+        if self._version != graph.version:
+            self._version = graph.version
+            self._results = {}
+        if key not in self._results:
+            self._results[key] = compute(graph)
+        return self._results[key]
+
+    def compact(self):
+        return self._cached("compact", CompactDAG.from_graph)
+
+    def critical_paths(self, forward, weight_based):
+        return self._cached(("critical_paths", forward, weight_based),
+                            lambda graph: _compute_critical_paths(self.compact(), forward, weight_based))
+
+    def top_levels(self):
+        """
+        Earliest start of every node: the heaviest path from an entry node, excluding the node
+        """
+        paths = self.critical_paths(False, True)
+        return self._cached("top_levels", lambda graph: {n_id: paths.length(n_id) for n_id in paths})
+
+    def bottom_levels(self):
+        """
+        The heaviest path from every node to an exit node, including the node
+        """
+        paths = self.critical_paths(True, True)
+        return self._cached("bottom_levels", lambda graph: {n_id: paths.length(n_id) for n_id in paths})
+
+    def levels(self):
+        return self._cached("levels", lambda graph: graph.levels())
+
+
+_ANALYSES = WeakKeyDictionary()
+
+
+def get_analysis(graph):
+    """
+    Shared analysis cache of a graph (DAG or Graph), results must not be modified
+    """
+    analysis = _ANALYSES.get(graph)
+    if analysis is None:
+        analysis = _ANALYSES[graph] = GraphAnalysis(graph)
+    return analysis
 
-    if weight_based:
-        def transformation(current_node, length):
-            return length[0] + current_node.weight, [current_node.n_id] + length[1]
-    else:
-        def transformation(current_node, length):
-            return length[0] + 1, [current_node.n_id] + length[1]
 
-    all_paths = dfs_caching(graph, aggregation, transformation, forward)
-    return all_paths
+def find_all_critical_paths(graph, forward, weight_based):
+    if isinstance(graph, CompactDAG):
+        return _compute_critical_paths(graph, forward, weight_based)
+    return get_analysis(graph).critical_paths(forward, weight_based)
 
 
 def find_critical_path(graph, forward=True, weight_based=True):
     all_paths = find_all_critical_paths(graph, forward, weight_based)
-    return max(all_paths.values())
+    return all_paths.critical()
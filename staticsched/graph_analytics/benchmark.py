@@ -0,0 +1,240 @@
+"""
+Scheduler and analysis throughput versus DAG and system size.
+
+    python -m staticsched.graph_analytics.benchmark run baseline.json
+    python -m staticsched.graph_analytics.benchmark run current.json
+    python -m staticsched.graph_analytics.benchmark compare baseline.json current.json
+
+compare exits with status 1 if any case got slower (or used more memory) than the
+baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+from collections import namedtuple
+from functools import partial
+from staticsched.graph_analytics.analyse import find_all_critical_paths
+from staticsched.graph_analytics.raw_graph import Graph, DAG
+from staticsched.graph_analytics.router import DFSRouter, BFSRouter
+from staticsched.graph_analytics.scheduler.schedulers import AdvanceNeighbourScheduler, ModellingNeighbourScheduler
+from staticsched.graph_analytics.system_template import SystemTemplate
+from staticsched.graph_analytics.task_queues import QueueGenerationPolicy3
+
+
+DEFAULT_SIZES = [50, 200, 1000, 5000, 20000]
+# Modelling scheduler takes minutes per run on 1000 tasks, raise with --schedule-limit
+DEFAULT_SCHEDULE_LIMIT = 200
+
+SCHEDULERS = {
+    "advance": AdvanceNeighbourScheduler,
+    "modelling": ModellingNeighbourScheduler,
+}
+
+ROUTERS = {
+    "dfs": DFSRouter,
+    "bfs": BFSRouter,
+}
+
+# setup() builds the input outside of the timed region, run(state) is timed
+Case = namedtuple("Case", ["name", "tasks", "setup", "run"])
+
+
+def load_system(path, links=None):
+    system_graph = Graph()
+    with open(path) as system_file:
+        override_node = {} if links is None else {"weight": links}
+        Graph.deserialize(system_graph, json.load(system_file), override_node=override_node)
+    return system_graph
+
+
+def ring_system(size, links=2):
+    system_graph = Graph()
+    for i in range(size):
+        system_graph.add_node(0, 0, links, str(i))
+    for i in range(size):
+        system_graph.add_edge(str(i), str((i + 1) % size), 1)
+    return system_graph
+
+
+def mesh_system(width, height, links=4):
+    system_graph = Graph()
+    for i in range(width * height):
+        system_graph.add_node(0, 0, links, str(i))
+    for i in range(width * height):
+        if i % width < width - 1:
+            system_graph.add_edge(str(i), str(i + 1), 1)
+        if i + width < width * height:
+            system_graph.add_edge(str(i), str(i + width), 1)
+    return system_graph
+
+
+SAVED = os.path.join(os.path.dirname(__file__), "..", "..", "saved")
+
+TOPOLOGIES = {
+    "thor": partial(load_system, os.path.join(SAVED, "thor"), links=3),
+    "grid": partial(load_system, os.path.join(SAVED, "grid")),
+    "ring16": partial(ring_system, 16),
+    "mesh4x4": partial(mesh_system, 4, 4),
+}
+
+
+def seeded_dag(tasks, seed=0):
+    """
+    DAG with about 3 edges per task and equal total weights of tasks and transmissions
+    """
+    max_edges_count = tasks * (tasks - 1) // 2
+    connections_percent = min(100, 100 * 3 * tasks / max(max_edges_count, 1))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return DAG.generate(min_weight=5, max_weight=20, count=tasks, connectivity=0.5,
+                            connections_percent=connections_percent, seed=seed)
+
+
+def _schedule_setup(topology, scheduler, tasks):
+    template = SystemTemplate(TOPOLOGIES[topology](), duplex=True, has_io_cpu=True)
+    return template.scheduler(SCHEDULERS[scheduler], seeded_dag(tasks), QueueGenerationPolicy3(),
+                              event_driven=True)
+
+
+def _schedule_run(scheduler):
+    scheduler.schedule_dag()
+
+
+def _route_setup(topology, router):
+    system_graph = TOPOLOGIES[topology]()
+    return system_graph, ROUTERS[router]
+
+
+def _route_run(state):
+    system_graph, router_class = state
+    router = router_class(system_graph)
+    for source in system_graph.nodes:
+        for target in system_graph.nodes:
+            router.route(0, source, target)
+
+
+def _critical_paths_setup(tasks):
+    return seeded_dag(tasks)
+
+
+def _critical_paths_run(dag):
+    dag.touch()  # drops the cached analysis
+    for forward in (True, False):
+        find_all_critical_paths(dag, forward=forward, weight_based=True).critical()
+
+
+def cases(sizes=DEFAULT_SIZES, schedule_limit=DEFAULT_SCHEDULE_LIMIT, topologies=TOPOLOGIES):
+    for topology in topologies:
+        for scheduler in SCHEDULERS:
+            for tasks in sizes:
+                if tasks <= schedule_limit:
+                    yield Case("schedule/{}/{}/{}".format(scheduler, topology, tasks), tasks,
+                               partial(_schedule_setup, topology, scheduler, tasks), _schedule_run)
+        for router in ROUTERS:
+            yield Case("route/{}/{}".format(router, topology), None,
+                       partial(_route_setup, topology, router), _route_run)
+    for tasks in sizes:
+        yield Case("critical_paths/{}".format(tasks), tasks,
+                   partial(_critical_paths_setup, tasks), _critical_paths_run)
+
+
+def measure(case, repeat=3, memory=True):
+    """
+    Best wall time of `repeat` runs and peak memory allocated by one more run
+    """
+    best = None
+    for _ in range(repeat):
+        state = case.setup()
+        started = time.perf_counter()
+        case.run(state)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    result = {"seconds": best}
+    if case.tasks:
+        result["tasks_per_second"] = case.tasks / best if best else None
+    if memory:
+        # tracemalloc slows everything down, so it gets a separate run
+        state = case.setup()
+        tracemalloc.start()
+        try:
+            case.run(state)
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(selected_cases, repeat=3, memory=True, log=None):
+    results = {}
+    for case in selected_cases:
+        results[case.name] = measure(case, repeat=repeat, memory=memory)
+        if log:
+            log("{}: {}".format(case.name, results[case.name]))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.25):
+    """
+    (case, metric, baseline value, current value) for every case of both runs where
+    seconds or peak_bytes grew by more than `threshold` (relative)
+    """
+    regressions = []
+    for name, base_result in sorted(baseline["results"].items()):
+        result = current["results"].get(name)
+        if result is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if base_result.get(metric) and result.get(metric) is not None:
+                if result[metric] > base_result[metric] * (1 + threshold):
+                    regressions.append((name, metric, base_result[metric], result[metric]))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Scheduler and analysis benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="runs benchmarks and stores results as JSON")
+    run_parser.add_argument("output")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--schedule-limit", type=int, default=DEFAULT_SCHEDULE_LIMIT,
+                            help="largest DAG given to the schedulers")
+    run_parser.add_argument("--topology", action="append", choices=sorted(TOPOLOGIES), default=None)
+    run_parser.add_argument("--filter", default="", help="runs only cases with this substring in the name")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--no-memory", action="store_true")
+
+    compare_parser = commands.add_parser("compare", help="flags regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(args)
+
+    if args.command == "run":
+        topologies = args.topology or list(TOPOLOGIES)
+        selected_cases = [case for case in cases(args.sizes, args.schedule_limit, topologies)
+                          if args.filter in case.name]
+        results = run_benchmarks(selected_cases, repeat=args.repeat, memory=not args.no_memory, log=print)
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+        return 0
+
+    with open(args.baseline) as baseline, open(args.current) as current:
+        regressions = compare(json.load(baseline), json.load(current), args.threshold)
+    for name, metric, base_value, value in regressions:
+        print("{} {}: {:.4g} -> {:.4g} ({:+.0%})".format(name, metric, base_value, value, value / base_value - 1))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
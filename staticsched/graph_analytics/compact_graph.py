@@ -0,0 +1,130 @@
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping
+from staticsched.graph_analytics.raw_graph import DAG
+
+
+CompactNode = namedtuple("CompactNode", ["n_id", "x", "y", "weight", "index"])
+
+
+def _weights_array(weights):
+    weights = list(weights)
+    typecode = "q" if all(isinstance(weight, int) for weight in weights) else "d"
+    return array(typecode, weights)
+
+
+def _csr(count, keys, values, edge_ids):
+    """
+    Stable counting sort of edges by `keys`: returns offsets and the
+    `values`/`edge_ids` laid out so that slots offsets[i]:offsets[i+1] belong to i
+    and keep the original edge order.
+    """
+    offsets = array("l", [0] * (count + 1))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    position = array("l", offsets[:-1])
+    indices = array("l", [0] * len(keys))
+    ordered_ids = array("l", [0] * len(keys))
+    for key, value, edge_id in zip(keys, values, edge_ids):
+        slot = position[key]
+        indices[slot] = value
+        ordered_ids[slot] = edge_id
+        position[key] += 1
+    return offsets, indices, ordered_ids
+
+
+class _CompactNodes(Mapping):
+    """
+    Read-only `n_id -> CompactNode` view, so code written against `GeneralGraph.nodes`
+    works on a CompactDAG without allocating Node objects up front
+    """
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, n_id):
+        return self._graph.node(self._graph.index[n_id])
+
+    def __iter__(self):
+        return iter(self._graph.node_ids)
+
+    def __len__(self):
+        return len(self._graph.node_ids)
+
+
+class CompactDAG:
+    """
+    Immutable CSR form of a DAG: nodes are dense integers 0..n-1 (`node_ids` maps them
+    back to n_id), weights live in flat arrays and successors/predecessors of node i
+    are the slices offsets[i]:offsets[i+1] of the index arrays. Neighbours keep the
+    order in which edges were added to the source graph.
+    """
+    __slots__ = ("node_ids", "index", "weights", "coords",
+                 "succ_offsets", "succ_indices", "succ_edges",
+                 "pred_offsets", "pred_indices", "pred_edges",
+                 "edge_weights", "nodes")
+
+    def __init__(self, node_ids, weights, coords, edge_sources, edge_targets, edge_weights):
+        count = len(node_ids)
+        edge_ids = range(len(edge_sources))
+
+        self.node_ids = tuple(node_ids)
+        self.index = {n_id: i for i, n_id in enumerate(self.node_ids)}
+        self.weights = _weights_array(weights)
+        self.coords = tuple(coords)
+        self.edge_weights = _weights_array(edge_weights)
+        self.succ_offsets, self.succ_indices, self.succ_edges = _csr(count, edge_sources, edge_targets, edge_ids)
+        self.pred_offsets, self.pred_indices, self.pred_edges = _csr(count, edge_targets, edge_sources, edge_ids)
+        self.nodes = _CompactNodes(self)
+
+    @classmethod
+    def from_graph(cls, graph):
+        node_ids = list(graph.nodes.keys())
+        index = {n_id: i for i, n_id in enumerate(node_ids)}
+        nodes = graph.nodes.values()
+        return cls(node_ids,
+                   [node.weight for node in nodes],
+                   [(node.x, node.y) for node in nodes],
+                   array("l", [index[edge.source.n_id] for edge in graph.edges]),
+                   array("l", [index[edge.target.n_id] for edge in graph.edges]),
+                   [edge.weight for edge in graph.edges])
+
+    def to_graph(self, graph_class=DAG):
+        graph = graph_class()
+        for i, n_id in enumerate(self.node_ids):
+            x, y = self.coords[i]
+            graph.add_node(x, y, self.weights[i], n_id)
+
+        edges = [None] * len(self.edge_weights)
+        for source in range(len(self.node_ids)):
+            for slot in range(self.succ_offsets[source], self.succ_offsets[source + 1]):
+                edges[self.succ_edges[slot]] = source, self.succ_indices[slot]
+        for edge_id, (source, target) in enumerate(edges):
+            graph.add_edge(self.node_ids[source], self.node_ids[target], self.edge_weights[edge_id])
+        return graph
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def node(self, i):
+        x, y = self.coords[i]
+        return CompactNode(self.node_ids[i], x, y, self.weights[i], i)
+
+    def successors(self, i):
+        return self.succ_indices[self.succ_offsets[i]:self.succ_offsets[i + 1]]
+
+    def predecessors(self, i):
+        return self.pred_indices[self.pred_offsets[i]:self.pred_offsets[i + 1]]
+
+    def get_neighbours(self, node, forward=True):
+        i = self.index[node.n_id]
+        neighbours = self.successors(i) if forward else self.predecessors(i)
+        return [self.node(j) for j in neighbours]
+
+    def is_directed(self):
+        return True
+
+    def duration_on_one_cpu(self):
+        return sum(self.weights)
@@ -8,3 +8,14 @@ class CohesionCPUPrioritizationPolicy(BaseCPUPrioritizationPolicy):
         nodes = graph.nodes.values()
         sorted_nodes = sorted(nodes, key=lambda node: (len(graph.get_neighbours(node)), node.n_id), reverse=True)
         return [node.n_id for node in sorted_nodes]
+
+
+class FixedCPUPrioritizationPolicy(BaseCPUPrioritizationPolicy):
+    """
+    Priorities computed once in advance, for a system graph that does not change
+    """
+    def __init__(self, priorities):
+        self._priorities = priorities
+
+    def get_priorities(self, graph):
+        return self._priorities
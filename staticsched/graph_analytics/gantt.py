@@ -1,6 +1,52 @@
+from bisect import bisect_left, bisect_right
 from collections import namedtuple
 from itertools import chain
 from staticsched.graph_analytics.raw_graph import Graph
+from staticsched.graph_analytics.stats import Stats
+
+
+def _discard(items, item):
+    """
+    list.remove() that takes O(1) for the most recently added item, the usual case on rollback
+    """
+    if items and items[-1] is item:
+        items.pop()
+    else:
+        items.remove(item)
+
+
+def _next_change(cpu, m_time, duration):
+    """
+    The earliest time after m_time at which the window [time, time + duration) can see
+    a different state of the CPU: its start or its last tick reaches a boundary
+    """
+    candidates = [cpu.next_boundary(m_time)]
+    last_tick_boundary = cpu.next_boundary(m_time + max(duration, 1) - 1)
+    if last_tick_boundary is not None:
+        candidates.append(last_tick_boundary - max(duration, 1) + 1)
+    return min((candidate for candidate in candidates if candidate is not None), default=None)
+
+
+def _next_free(cpu, m_time, duration, is_free, counter):
+    """
+    The earliest time >= m_time at which is_free(time) holds, is_free must depend only
+    on the state of `cpu` during [time, time + duration). Every time checked is
+    counted as `counter` in the CPU stats.
+    """
+    while True:
+        if cpu.stats:
+            cpu.stats.count(counter)
+        if is_free(m_time):
+            break
+        next_time = _next_change(cpu, m_time, duration)
+        if next_time is None:
+            raise ValueError("CPU {} never gets free for {} ticks".format(cpu.cpu_id, duration))
+        m_time = next_time
+    return m_time
+
+
+Reservation = namedtuple("Reservation", ["cpu_id", "link_id", "start", "end",
+                                         "task_name", "direction", "communication_cpu"])
 
 
 class ScheduledTask:
@@ -12,6 +58,9 @@ class ScheduledTask:
     def cancel(self):
         self.cpu.cancel_calculation(self)
 
+    def reservation(self):
+        return Reservation(self.cpu.cpu_id, None, *self.range, self.task_name, None, None)
+
 
 SegmentMeta = namedtuple("SegmentMeta", ["source", "out_task", "target", "in_task"])
 
@@ -71,6 +120,94 @@ class ScheduledTransmissionSegment:
     def cancel(self):
         self.link.cancel_transmission(self)
 
+    def reservation(self):
+        return Reservation(self.link.cpu.cpu_id, self.link.link_id, *self.range,
+                           None, self.direction, self.communication_cpu)
+
+
+class Timeline:
+    """
+    Index of non-overlapping scheduled items (anything with a [start, end) `range`)
+    sorted by start time. Empty ranges never occupy the timeline and are not indexed.
+    """
+    def __init__(self):
+        self._starts = []
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item):
+        start, end = item.range
+        if end <= start:
+            return
+        assert self.is_free(start, end - start), "overlapping items on a timeline"
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._items.insert(i, item)
+
+    def remove(self, item):
+        start, end = item.range
+        if end <= start:
+            return
+        i = bisect_left(self._starts, start)
+        while self._items[i] is not item:
+            i += 1
+        del self._starts[i]
+        del self._items[i]
+
+    def item_at(self, m_time):
+        i = bisect_right(self._starts, m_time) - 1
+        if i >= 0 and self._items[i].range[1] > m_time:
+            return self._items[i]
+
+    def is_free(self, m_time, duration):
+        """
+        True if nothing is scheduled in [m_time, m_time + duration)
+        """
+        if duration <= 0:
+            return True
+        # items are disjoint, so the last one starting before the range ends last
+        i = bisect_left(self._starts, m_time + duration) - 1
+        return i < 0 or self._items[i].range[1] <= m_time
+
+    def next_gap(self, m_time, duration):
+        """
+        The earliest time >= m_time such that [time, time + duration) is free
+        """
+        if duration <= 0:
+            return m_time
+        i = max(bisect_right(self._starts, m_time) - 1, 0)
+        while i < len(self._items) and self._starts[i] < m_time + duration:
+            m_time = max(m_time, self._items[i].range[1])
+            i += 1
+        return m_time
+
+    def next_boundary(self, m_time):
+        """
+        The earliest start or end of an item after m_time, None if there is none
+        """
+        i = bisect_right(self._starts, m_time)
+        boundaries = []
+        if i < len(self._starts):
+            boundaries.append(self._starts[i])
+        if i > 0 and self._items[i - 1].range[1] > m_time:
+            boundaries.append(self._items[i - 1].range[1])
+        return min(boundaries, default=None)
+
+    def boundaries(self, start, end):
+        """
+        Start and end times of the items that fall strictly inside (start, end)
+        """
+        points = []
+        i = max(bisect_right(self._starts, start) - 1, 0)
+        while i < len(self._items) and self._starts[i] < end:
+            for point in self._items[i].range:
+                if start < point < end:
+                    points.append(point)
+            i += 1
+        return points
+
 
 class Link:
     def __init__(self, cpu, link_id, duplex):
@@ -78,91 +215,154 @@ class Link:
         self.duplex = duplex
         self.link_id = link_id
         self._io_tasks = []
+        # one timeline per direction: segments of the same direction never overlap
+        self._timelines = {ScheduledTransmissionSegment.INGOING: Timeline(),
+                           ScheduledTransmissionSegment.OUTGOING: Timeline()}
 
     def schedule_transmission(self, transmission, m_time, duration, direction, communication_cpu):
         task = ScheduledTransmissionSegment(transmission, m_time, m_time + duration,
                                             communication_cpu, direction, self)
         self._io_tasks.append(task)
+        self._timelines[direction].add(task)
         return task
 
     def cancel_transmission(self, task):
-        self._io_tasks.remove(task)
+        _discard(self._io_tasks, task)
+        self._timelines[task.direction].remove(task)
+
+    def segments_at_time(self, m_time):
+        return [segment for segment in (timeline.item_at(m_time) for timeline in self._timelines.values())
+                if segment is not None]
+
+    def boundaries(self, start, end):
+        return list(chain(*[timeline.boundaries(start, end) for timeline in self._timelines.values()]))
+
+    def next_boundary(self, m_time):
+        boundaries = [timeline.next_boundary(m_time) for timeline in self._timelines.values()]
+        return min((boundary for boundary in boundaries if boundary is not None), default=None)
 
     def is_link_free(self, m_time, direction=None, communication_cpu=None):
         link_with_com_cpu = self.cpu.get_link_with_cpu_at_time(m_time, communication_cpu)
+        return self.is_link_free_with(m_time, direction, communication_cpu, link_with_com_cpu)
+
+    def is_link_free_with(self, m_time, direction, communication_cpu, link_with_com_cpu):
+        """
+        is_link_free() with the CPU's link to communication_cpu at m_time already looked up
+        """
         if link_with_com_cpu and link_with_com_cpu != self:
             return False
 
-        for segment in self._io_tasks:
-            start, end = segment.range
-            if start <= m_time < end:
-                if direction is None:
-                    # disrespect direction/duplex
-                    return False
+        for segment in self.segments_at_time(m_time):
+            if direction is None:
+                # disrespect direction/duplex
+                return False
 
-                if not self.duplex:
+            if not self.duplex:
+                return False
+            else:
+                # same direction is forbidden
+                if segment.direction == direction:
                     return False
                 else:
-                    # same direction is forbidden
-                    if segment.direction == direction:
+                    if segment.communication_cpu != communication_cpu:
+                        # duplex only for bi-directional communication
+                        # between same CPUs
                         return False
-                    else:
-                        if segment.communication_cpu != communication_cpu:
-                            # duplex only for bi-directional communication
-                            # between same CPUs
-                            return False
         return True
 
     def is_link_free_duration(self, m_time, duration, direction, communication_cpu):
-        return all(self.is_link_free(time, direction, communication_cpu)
-                   for time in range(m_time, m_time + duration)
-                   )
+        if self.cpu.stats:
+            self.cpu.stats.count("is_link_free_duration")
+        return bool(self.cpu.free_links(m_time, duration, direction, communication_cpu, links=[self]))
 
     def get_connected_cpu_at_time(self, m_time):
-        for segment in self._io_tasks:
-            start, end = segment.range
-            if start <= m_time < end:
-                return segment.communication_cpu
+        # segments active at the same time always share the communication CPU
+        for segment in self.segments_at_time(m_time):
+            return segment.communication_cpu
 
 
 class CPU:
-    def __init__(self, cpu_id, links, duplex, has_io_cpu):
+    def __init__(self, cpu_id, links, duplex, has_io_cpu, stats=None):
         self.cpu_id = cpu_id
+        self.stats = stats
         self._links = [Link(self, link_id, duplex) for link_id in range(links)]
         self._alu_tasks = []
+        self._tasks_by_name = {}
+        self._alu_timeline = Timeline()
         self._has_io_cpu = has_io_cpu
 
     def is_task_scheduled(self, task_name):
-        return any(task.task_name == task_name for task in self._alu_tasks)
+        return task_name in self._tasks_by_name
 
     def is_alu_free(self, m_time):
+        if self.stats:
+            self.stats.count("is_alu_free")
         if not self._has_io_cpu and any(not link.is_link_free(m_time) for link in self._links):
             return False
 
-        for task in self._alu_tasks:
-            start, end = task.range
-            if start <= m_time < end:
-                return False
-        return True
+        return self._alu_timeline.item_at(m_time) is None
 
     def is_alu_free_duration(self, m_time, duration):
+        if self.stats:
+            self.stats.count("is_alu_free_duration")
+        if self._has_io_cpu:
+            return self._alu_timeline.is_free(m_time, duration)
         return all(self.is_alu_free(time)
-                   for time in range(m_time, m_time + duration)
+                   for time in self.change_points(m_time, duration)
                    )
 
+    def next_boundary(self, m_time):
+        """
+        The earliest time after m_time at which the ALU or a link of this CPU changes state
+        """
+        boundaries = [self._alu_timeline.next_boundary(m_time)]
+        boundaries += [link.next_boundary(m_time) for link in self._links]
+        return min((boundary for boundary in boundaries if boundary is not None), default=None)
+
+    def change_points(self, m_time, duration):
+        """
+        Times in [m_time, m_time + duration) at which state of the ALU or links
+        of this CPU may change: m_time itself and every boundary inside the range.
+        Free/busy checks at these points cover every tick of the range.
+        """
+        if duration <= 0:
+            return []
+        end = m_time + duration
+        points = set(self._alu_timeline.boundaries(m_time, end))
+        for link in self._links:
+            points.update(link.boundaries(m_time, end))
+        return [m_time] + sorted(points)
+
     def has_free_link(self, m_time, duration, direction, communication_cpu):
         if not self._has_io_cpu and not self.is_alu_free_duration(m_time, duration):
             return False
 
-        return any(link.is_link_free_duration(m_time, duration, direction, communication_cpu)
-                   for link in self._links)
+        return bool(self.free_links(m_time, duration, direction, communication_cpu))
 
     def any_free_link(self, m_time, duration, direction, communication_cpu):
         if not self._has_io_cpu and not self.is_alu_free_duration(m_time, duration):
             return []
 
-        return [link for link in self._links
-                if link.is_link_free_duration(m_time, duration, direction, communication_cpu)]
+        return self.free_links(m_time, duration, direction, communication_cpu)
+
+    def free_links(self, m_time, duration, direction, communication_cpu, links=None):
+        """
+        Links (of `links`, all by default) free during the whole [m_time, m_time + duration).
+        Link state only changes at segment boundaries on the links of this CPU,
+        so the links are checked at those points only.
+        """
+        links = list(self._links if links is None else links)
+        if self.stats:
+            self.stats.count("free_links")
+        for time in self.change_points(m_time, duration):
+            if self.stats:
+                self.stats.count("link_points_probed")
+            link_with_com_cpu = self.get_link_with_cpu_at_time(time, communication_cpu)
+            links = [link for link in links
+                     if link.is_link_free_with(time, direction, communication_cpu, link_with_com_cpu)]
+            if not links:
+                break
+        return links
 
     def get_link_with_cpu_at_time(self, m_time, communication_cpu):
         for link in self._links:
@@ -172,13 +372,20 @@ class CPU:
     def schedule_calculation(self, task_name, m_time, duration):
         task = ScheduledTask(task_name, m_time, m_time + duration, self)
         self._alu_tasks.append(task)
+        self._tasks_by_name.setdefault(task_name, []).append(task)
+        self._alu_timeline.add(task)
         return task
 
     def cancel_calculation(self, task):
-        self._alu_tasks.remove(task)
+        _discard(self._alu_tasks, task)
+        same_name = self._tasks_by_name[task.task_name]
+        _discard(same_name, task)
+        if not same_name:
+            del self._tasks_by_name[task.task_name]
+        self._alu_timeline.remove(task)
 
     def get_scheduled_task(self, task_name):
-        return [task for task in self._alu_tasks if task.task_name == task_name][0]
+        return self._tasks_by_name[task_name][0]
 
     def schedule_transmission(self, transmission, m_time, duration, direction, communication_cpu):
         link = self.any_free_link(m_time, duration, direction, communication_cpu)[0]
@@ -195,15 +402,31 @@ class CPU:
 
 
 class System:
-    def __init__(self, graph: Graph, duplex, has_io_cpu):
+    def __init__(self, graph: Graph, duplex, has_io_cpu, layout=None, collect_stats=False):
         self._graph = graph
         self._cpus = {}
-        self._transmission_sessions = []
-        self._current_session = []
-        for node in graph.nodes.values():
-            links_count = min(node.weight, len(self._graph.get_neighbours(node)))
-            cpu = CPU(cpu_id=node.n_id, links=node.weight, duplex=duplex, has_io_cpu=has_io_cpu)
-            self._cpus[node.n_id] = cpu
+        self.stats = Stats() if collect_stats else None
+        # every reservation in the order it was made, undone in reverse by rollback()
+        self._undo_log = []
+        self._session_start = 0
+        for cpu_id, links in (System.layout(graph) if layout is None else layout):
+            self._cpus[cpu_id] = CPU(cpu_id=cpu_id, links=links, duplex=duplex, has_io_cpu=has_io_cpu,
+                                     stats=self.stats)
+
+    @staticmethod
+    def layout(graph: Graph):
+        """
+        (cpu_id, links count) of every CPU of the system graph
+        """
+        return [(node.n_id, node.weight) for node in graph.nodes.values()]
+
+    def next_event_time(self, m_time):
+        """
+        The earliest time after m_time at which any reservation starts or ends,
+        None if nothing is scheduled after m_time
+        """
+        boundaries = [cpu.next_boundary(m_time) for cpu in self._cpus.values()]
+        return min((boundary for boundary in boundaries if boundary is not None), default=None)
 
     def free_alu_cpus(self, m_time):
         return [cpu.cpu_id for cpu in self._cpus.values() if cpu.is_alu_free(m_time)]
@@ -221,17 +444,55 @@ class System:
         cpu = self._cpus[cpu_id]
         m_time = self.find_calculation_time_range(m_time, duration, cpu)
         scheduled_task = cpu.schedule_calculation(task_name, m_time, duration)
-        self._current_session.append(scheduled_task)
+        self._undo_log.append(scheduled_task)
         return scheduled_task
 
+    def checkpoint(self):
+        """
+        Token for the current state of the schedule, see rollback()
+        """
+        return len(self._undo_log)
+
+    def rollback(self, token):
+        """
+        Cancels every calculation and transmission scheduled after checkpoint() returned `token`.
+        Reservations are undone newest first, so the work is proportional to their number.
+        """
+        assert 0 <= token <= len(self._undo_log), "rollback to an unknown checkpoint"
+        if self.stats:
+            self.stats.count("rollbacks")
+            self.stats.count("rolled_back_reservations", len(self._undo_log) - token)
+        while len(self._undo_log) > token:
+            self._undo_log.pop().cancel()
+        self._session_start = min(self._session_start, token)
+
+    def reservations(self, token=0):
+        """
+        Picklable copies of the reservations made after checkpoint() returned `token`,
+        in the order they were made
+        """
+        return [item.reservation() for item in self._undo_log[token:]]
+
+    def replay(self, reservations):
+        """
+        Applies reservations() of another System with the same CPUs to this one
+        """
+        for reservation in reservations:
+            cpu = self._cpus[reservation.cpu_id]
+            duration = reservation.end - reservation.start
+            if reservation.link_id is None:
+                item = cpu.schedule_calculation(reservation.task_name, reservation.start, duration)
+            else:
+                item = cpu._links[reservation.link_id].schedule_transmission(None, reservation.start, duration,
+                                                                             reservation.direction,
+                                                                             reservation.communication_cpu)
+            self._undo_log.append(item)
+
     def new_session(self):
-        if self._current_session:
-            self._transmission_sessions.append(self._current_session)
-        self._current_session = []
+        self._session_start = self.checkpoint()
 
     def cancel_session(self):
-        for transmission in self._current_session:
-            transmission.cancel()
+        self.rollback(self._session_start)
 
     def schedule_transmission(self, route, source_cpu, target_cpu, m_time, source_task, target_task, duration):
         if not route:
@@ -251,36 +512,85 @@ class System:
                                                                        ScheduledTransmissionSegment.INGOING,
                                                                        segment_source)
 
+            self._undo_log.append(task_out)
+            self._undo_log.append(task_in)
             transmission.add_segment(segment_source, task_in, segment_target, task_out)
             m_time += duration
             assert transmission.end_time() == m_time
 
-        self._current_session.append(transmission)
         return transmission
 
     @staticmethod
-    def find_transmission_time_range(transmission, m_time, segment_source_cpu, segment_target_cpu):
-        outgoing_time_found = False
-        ingoing_time_found = False
-        while (not ingoing_time_found) or (not outgoing_time_found):
-            while not segment_source_cpu.has_free_link(m_time, transmission.duration,
-                                                       ScheduledTransmissionSegment.OUTGOING,
-                                                       segment_target_cpu.cpu_id):
-                m_time += 1
-            outgoing_time_found = True
-            while not segment_target_cpu.has_free_link(m_time, transmission.duration,
-                                                       ScheduledTransmissionSegment.INGOING,
-                                                       segment_source_cpu.cpu_id):
-                m_time += 1
-                outgoing_time_found = False
-            ingoing_time_found = True
+    def earliest_slot(resource, after, duration, direction=None, peer=None):
+        """
+        The earliest time >= after at which `resource` (a CPU) is free for `duration` ticks:
+        its ALU, or with a direction its link in that direction to `peer` together with
+        a link of `peer` in the opposite direction. Equal to probing every tick, but
+        jumps from one boundary of the scheduled items to the next.
+        """
+        if direction is None:
+            return _next_free(resource, after, duration,
+                              lambda m_time: resource.is_alu_free_duration(m_time, duration),
+                              "calculation_slots_probed")
+
+        if direction == ScheduledTransmissionSegment.OUTGOING:
+            opposite = ScheduledTransmissionSegment.INGOING
+        else:
+            opposite = ScheduledTransmissionSegment.OUTGOING
+        sides = [(resource, lambda m_time: resource.has_free_link(m_time, duration, direction, peer.cpu_id)),
+                 (peer, lambda m_time: peer.has_free_link(m_time, duration, opposite, resource.cpu_id))]
+        m_time = after
+        # sides found free at m_time in a row, each side is searched from where the other stopped
+        free_sides = 0
+        side = 0
+        while free_sides < len(sides):
+            cpu, is_free = sides[side]
+            slot = _next_free(cpu, m_time, duration, is_free, "transmission_slots_probed")
+            if slot == m_time:
+                free_sides += 1
+            else:
+                m_time = slot
+                free_sides = 1
+                if side and resource.stats:
+                    # the source side has to be searched again from the new time
+                    resource.stats.count("transmission_retries")
+            side = (side + 1) % len(sides)
         return m_time
 
+    @staticmethod
+    def find_transmission_time_range(transmission, m_time, segment_source_cpu, segment_target_cpu):
+        if segment_source_cpu.stats:
+            segment_source_cpu.stats.count("find_transmission_time_range")
+        return System.earliest_slot(segment_source_cpu, m_time, transmission.duration,
+                                    ScheduledTransmissionSegment.OUTGOING, segment_target_cpu)
+
     @staticmethod
     def find_calculation_time_range(m_time, duration, cpu):
-        while not cpu.is_alu_free_duration(m_time, duration):
-            m_time += 1
-        return m_time
+        if cpu.stats:
+            cpu.stats.count("find_calculation_time_range")
+        return System.earliest_slot(cpu, m_time, duration)
 
     def duration(self):
         return max((cpu.last_tick() for cpu in self._cpus.values()), default=0)
+
+    def placement(self):
+        """
+        Calculations and transmission segments of the schedule as JSON-friendly dicts
+        """
+        tasks = []
+        transmissions = []
+        for cpu in self._cpus.values():
+            for task in cpu._alu_tasks:
+                tasks.append({"task": task.task_name, "cpu": cpu.cpu_id, "start": task.range[0], "end": task.range[1]})
+            for link in cpu._links:
+                for segment in link._io_tasks:
+                    transmission = segment.transmission
+                    transmissions.append({
+                        "cpu": cpu.cpu_id, "link": link.link_id,
+                        "start": segment.range[0], "end": segment.range[1],
+                        "direction": "in" if segment.direction == ScheduledTransmissionSegment.INGOING else "out",
+                        "peer": segment.communication_cpu,
+                        "source": transmission.source.n_id if transmission else None,
+                        "target": transmission.target.n_id if transmission else None,
+                    })
+        return {"tasks": tasks, "transmissions": transmissions}
@@ -1,4 +1,5 @@
-from random import randint, sample, normalvariate
+from math import isqrt
+from random import Random
 import uuid
 import warnings
 
@@ -8,12 +9,22 @@ class GeneralGraph:
         self.nodes = {}
         self.edges = []
         self.graph_id = uuid.uuid4().hex[:8]
+        # bumped on every structural or weight change, see touch()
+        self.version = 0
+        # adjacency index: node id -> edges in the order they were added
+        self._out_edges = {}
+        self._in_edges = {}
+        self._incident_edges = {}
 
     def add_node(self, x, y, weight, n_id=None, **kwargs):
         if not n_id:
             n_id = uuid.uuid4().hex[:8]
-        node = Node(n_id, x, y, weight)
+        node = Node(n_id, x, y, weight, graph=self)
         self.nodes[n_id] = node
+        self.touch()
+        self._out_edges.setdefault(n_id, [])
+        self._in_edges.setdefault(n_id, [])
+        self._incident_edges.setdefault(n_id, [])
         return node
 
     def add_edge(self, source, target, weight, **kwargs):
@@ -24,17 +35,49 @@ class GeneralGraph:
             target = self.nodes[target]
         assert isinstance(target, Node)
 
-        edge = Edge(source, target, weight)
+        edge = Edge(source, target, weight, graph=self)
         self.edges.append(edge)
+        self.touch()
+        self._out_edges.setdefault(source.n_id, []).append(edge)
+        self._in_edges.setdefault(target.n_id, []).append(edge)
+        self._incident_edges.setdefault(source.n_id, []).append(edge)
+        if target.n_id != source.n_id:
+            self._incident_edges.setdefault(target.n_id, []).append(edge)
         return edge
 
     def delete_node(self, node_id):
         if node_id in self.nodes:
+            for edge in list(self._incident_edges.get(node_id, [])):
+                self.delete_edge(edge)
             del self.nodes[node_id]
+            self._out_edges.pop(node_id, None)
+            self._in_edges.pop(node_id, None)
+            self._incident_edges.pop(node_id, None)
+            self.touch()
 
     def delete_edge(self, edge):
-        if edge in self.edges:
-            self.edges.remove(edge)
+        source_id, target_id = edge.source.n_id, edge.target.n_id
+        if edge not in self._out_edges.get(source_id, []):
+            return
+        self.edges.remove(edge)
+        self._out_edges[source_id].remove(edge)
+        self._in_edges[target_id].remove(edge)
+        self._incident_edges[source_id].remove(edge)
+        if target_id != source_id:
+            self._incident_edges[target_id].remove(edge)
+        self.touch()
+
+    def touch(self):
+        """
+        Marks the graph as changed, so cached analysis results are recomputed
+        """
+        self.version += 1
+
+    def edges_from_node(self, node):
+        return list(self._out_edges.get(node.n_id, []))
+
+    def edges_to_node(self, node):
+        return list(self._in_edges.get(node.n_id, []))
 
     def serialize(self):
         return {"nodes": [node.serialize_node() for node in self.nodes.values()],
@@ -55,6 +98,7 @@ class GeneralGraph:
         y_sorted_nodes = sorted(self.nodes.values(), key=lambda node: (node.y, node.x))
         for i, node in enumerate(y_sorted_nodes):
             node.n_id = str(i)
+        self.touch()
 
 
 def norm_weight(weight, min_w, max_w, avg):
@@ -68,42 +112,80 @@ def norm_weight(weight, min_w, max_w, avg):
         return weight
 
 
+def _pair_row_start(row, count):
+    return row * (2 * count - row - 1) // 2
+
+
+def _pair_from_index(index, count):
+    """
+    Inverse of the lexicographic enumeration of pairs (i, j), 0 <= i < j < count
+    """
+    b = 2 * count - 1
+    row = (b - isqrt(b * b - 8 * index)) // 2
+    while row > 0 and _pair_row_start(row, count) > index:
+        row -= 1
+    while _pair_row_start(row + 1, count) <= index:
+        row += 1
+    return row, index - _pair_row_start(row, count) + row + 1
+
+
+def _sample_indices(rng, population, k):
+    """
+    k distinct integers from range(population) in random order,
+    without materialising the population when k is small
+    """
+    if 2 * k <= population:
+        selected = set()
+        result = []
+        while len(result) < k:
+            index = rng.randrange(population)
+            if index not in selected:
+                selected.add(index)
+                result.append(index)
+        return result
+
+    excluded = set(_sample_indices(rng, population, population - k))
+    result = [index for index in range(population) if index not in excluded]
+    rng.shuffle(result)
+    return result
+
+
 class DAG(GeneralGraph):
     def get_neighbours(self, node, forward=True):
-        neighbours = []
-        for edge in self.edges:
-            if forward:
-                if edge.source.n_id == node.n_id:
-                    neighbours.append(self.nodes[edge.target.n_id])
-            else:
-                if edge.target.n_id == node.n_id:
-                    neighbours.append(self.nodes[edge.source.n_id])
-        return neighbours
-
-    def edges_to_node(self, node):
-        edges = []
-        for edge in self.edges:
-            if edge.target.n_id == node.n_id:
-                edges.append(edge)
-        return edges
+        if forward:
+            return [self.nodes[edge.target.n_id] for edge in self._out_edges.get(node.n_id, [])]
+        else:
+            return [self.nodes[edge.source.n_id] for edge in self._in_edges.get(node.n_id, [])]
 
     def is_directed(self):
         return True
 
     def levels(self):
+        """
+        Partitions nodes into levels: a node is placed on the level right after
+        the last of its parents. Nodes inside a level keep the order of `self.nodes`.
+        Raises ValueError if the graph has a cycle.
+        """
+        order = {n_id: i for i, n_id in enumerate(self.nodes)}
+        in_degree = {n_id: len(self._in_edges.get(n_id, [])) for n_id in self.nodes}
+
         levels = []
-        ready = []
-
-        while len(ready) < len(self.nodes):
-            level = []
-            for node in self.nodes.values():
-                if node.n_id in ready:
-                    continue
-                inputs = [inp.source for inp in self.edges if inp.target.n_id == node.n_id]
-                if all((source.n_id in ready) for source in inputs):
-                    level.append(node.n_id)
+        level = [n_id for n_id in self.nodes if in_degree[n_id] == 0]
+        placed = 0
+        while level:
             levels.append(level)
-            ready += level
+            placed += len(level)
+            next_level = []
+            for n_id in level:
+                for edge in self._out_edges.get(n_id, []):
+                    target_id = edge.target.n_id
+                    in_degree[target_id] -= 1
+                    if in_degree[target_id] == 0:
+                        next_level.append(target_id)
+            level = sorted(next_level, key=order.get)
+
+        if placed < len(self.nodes):
+            raise ValueError("Graph {} has a cycle, levels are undefined".format(self.graph_id))
         return levels
 
     def arrange(self):
@@ -133,37 +215,42 @@ class DAG(GeneralGraph):
     def generate(cls,
                  min_weight, max_weight,
                  count, connectivity, connections_percent,
-                 min_edge_weight=1, max_edge_weight=9999):
+                 min_edge_weight=1, max_edge_weight=9999, seed=None):
+        rng = Random(seed)
         graph = DAG()
-        sum_weight = 0
-        for i in range(count):
-            weight = randint(min_weight, max_weight)
-            graph.add_node(randint(0, 300), randint(0, 300), weight, str(i))
-            sum_weight += weight
+        weights = [rng.randint(min_weight, max_weight) for _ in range(count)]
+        for i, weight in enumerate(weights):
+            # coordinates are assigned by arrange()
+            graph.add_node(0, 0, weight, str(i))
+        sum_weight = sum(weights)
 
         sum_edges_weight = (sum_weight - connectivity*sum_weight) / connectivity
 
-        max_edges_count = (count*(count-1)) / 2
+        max_edges_count = (count*(count-1)) // 2
         edges_count = int(connections_percent/100*max_edges_count)
 
-        pairs = [(str(i), str(j)) for i in range(count) for j in range(i+1, count)]
+        # edges are drawn as indices into the (i < j) pairs enumeration instead of
+        # building the O(count^2) list of pairs; edge weights are drawn in one batch
+        # of standard normal deviates and scaled by the running average below
+        pairs = (_pair_from_index(index, count) for index in _sample_indices(rng, max_edges_count, edges_count))
+        deviations = [rng.gauss(0, 1) for _ in range(edges_count)]
         # 1 1 30 0.1 10 1 500
         sum_edges_weight_actual = 0
         last_edge = None
         added_edges_count = 0
         average_edge_weight = sum_edges_weight / edges_count
-        for source, target in sample(pairs, edges_count):
+        for (source, target), deviation in zip(pairs, deviations):
             average_edge_weight = max(1, ((sum_edges_weight - sum_edges_weight_actual) / (edges_count - added_edges_count)))
-            weight = int(normalvariate(average_edge_weight, average_edge_weight/4))
+            weight = int(average_edge_weight + deviation * average_edge_weight/4)
             weight = norm_weight(weight, min_edge_weight, max_edge_weight, average_edge_weight)
             if sum_edges_weight - (sum_edges_weight_actual + weight) < 0:
                 weight = max(1, int(sum_edges_weight - sum_edges_weight_actual))
-                last_edge = graph.add_edge(source, target, weight)
+                last_edge = graph.add_edge(str(source), str(target), weight)
                 sum_edges_weight_actual += weight
                 warnings.warn("Stopped, maximum reached: last edge weight was {} < {} < {}".
                               format(min_edge_weight, weight, max_edge_weight))
                 break
-            last_edge = graph.add_edge(source, target, weight)
+            last_edge = graph.add_edge(str(source), str(target), weight)
             sum_edges_weight_actual += weight
             added_edges_count += 1
         else:
@@ -186,7 +273,7 @@ class DAG(GeneralGraph):
 class Graph(GeneralGraph):
     def get_neighbours(self, node, forward=None):
         neighbours = []
-        for edge in self.edges:
+        for edge in self._incident_edges.get(node.n_id, []):
             if edge.source.n_id == node.n_id:
                 neighbours.append(self.nodes[edge.target.n_id])
             if edge.target.n_id == node.n_id:
@@ -198,11 +285,22 @@ class Graph(GeneralGraph):
 
 
 class Node:
-    def __init__(self, n_id, x, y, w):
+    def __init__(self, n_id, x, y, w, graph=None):
+        self._graph = graph
         self.n_id = n_id
         self.y = y
         self.x = x
-        self.weight = w
+        self._weight = w
+
+    @property
+    def weight(self):
+        return self._weight
+
+    @weight.setter
+    def weight(self, weight):
+        self._weight = weight
+        if self._graph is not None:
+            self._graph.touch()
 
     def serialize_node(self):
         return {"x": self.x,
@@ -213,10 +311,21 @@ class Node:
 
 
 class Edge:
-    def __init__(self, source, target, w):
+    def __init__(self, source, target, w, graph=None):
+        self._graph = graph
         self.source = source
         self.target = target
-        self.weight = w
+        self._weight = w
+
+    @property
+    def weight(self):
+        return self._weight
+
+    @weight.setter
+    def weight(self, weight):
+        self._weight = weight
+        if self._graph is not None:
+            self._graph.touch()
 
     def serialize_edge(self):
         return {"source": self.source.n_id,
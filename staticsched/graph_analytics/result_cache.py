@@ -0,0 +1,98 @@
+import json
+import os
+from hashlib import sha256
+from tempfile import NamedTemporaryFile
+
+
+# bump when a scheduler change makes stored schedules stale
+CACHE_VERSION = 1
+
+
+def canonical_graph(graph):
+    """
+    Everything about a graph that affects a schedule. Coordinates are left out,
+    order of nodes and edges is kept: it breaks ties between tasks and CPUs.
+    """
+    return {"nodes": [[node.n_id, node.weight] for node in graph.nodes.values()],
+            "edges": [[edge.source.n_id, edge.target.n_id, edge.weight] for edge in graph.edges]}
+
+
+def schedule_key(dag, system_graph, params):
+    """
+    Content hash of a scheduling problem, `params` is a JSON-serializable dict
+    of the scheduler settings (queue policy, scheduler, duplex, io_cpu, ...)
+    """
+    problem = {"version": CACHE_VERSION,
+               "dag": canonical_graph(dag),
+               "system": canonical_graph(system_graph),
+               "params": params}
+    canonical = json.dumps(problem, sort_keys=True, separators=(",", ":"))
+    return sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Schedule results stored as one JSON file per key in `directory`.
+    Once the files take more than max_bytes, the least recently used are removed.
+    """
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as result_file:
+                result = json.load(result_file)
+        except (FileNotFoundError, ValueError):
+            return None
+        # modification time is the LRU clock
+        os.utime(path)
+        return result
+
+    def put(self, key, result):
+        with NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False) as result_file:
+            json.dump(result, result_file)
+        os.replace(result_file.name, self._path(key))
+        self.evict()
+
+    def entries(self):
+        """
+        (mtime, size, path) of the stored results, least recently used first
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get_or_compute(self, key, compute):
+        """
+        Stored result of `key`, computes and stores it on a miss
+        """
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
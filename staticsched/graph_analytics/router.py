@@ -1,3 +1,4 @@
+from collections import deque
 from staticsched.graph_analytics.gantt import System
 from staticsched.graph_analytics.raw_graph import Graph
 
@@ -62,3 +63,74 @@ class DFSRouter(Router):
                     if not shortest or len(newpath) < len(shortest):
                         shortest = newpath
         return shortest
+
+
+class BFSRouter(Router):
+    """
+    Shortest path router backed by next-hop and distance tables built with one
+    BFS per node. Among equally short paths it picks the same one as DFSRouter:
+    the first one in neighbour order. Tables are rebuilt if the graph changes.
+    """
+    def __init__(self, graph: Graph):
+        super().__init__(graph)
+        self._version = None
+        self._distances = {}
+        self._next_hops = {}
+        self.build_tables()
+
+    def build_tables(self):
+        neighbours = {n_id: [neighbour.n_id for neighbour in self._graph.get_neighbours(node)]
+                      for n_id, node in self._graph.nodes.items()}
+        reverse_neighbours = {n_id: [] for n_id in neighbours}
+        for n_id, node_neighbours in neighbours.items():
+            for neighbour in node_neighbours:
+                reverse_neighbours[neighbour].append(n_id)
+
+        self._distances = {}
+        self._next_hops = {}
+        for target in neighbours:
+            # hop distance of every node to `target`
+            to_target = self.bfs(target, reverse_neighbours)
+            next_hops = {}
+            for n_id, distance in to_target.items():
+                if distance:
+                    next_hops[n_id] = next(neighbour for neighbour in neighbours[n_id]
+                                           if to_target.get(neighbour) == distance - 1)
+            self._distances[target] = to_target
+            self._next_hops[target] = next_hops
+        self._version = self._graph.version
+
+    @staticmethod
+    def bfs(start, neighbours):
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            n_id = queue.popleft()
+            for neighbour in neighbours[n_id]:
+                if neighbour not in distances:
+                    distances[neighbour] = distances[n_id] + 1
+                    queue.append(neighbour)
+        return distances
+
+    def _ensure_tables(self):
+        if self._version != self._graph.version:
+            self.build_tables()
+
+    def distance(self, source, target):
+        """
+        Hops between CPUs or None if target is unreachable
+        """
+        self._ensure_tables()
+        return self._distances[target].get(source)
+
+    def route(self, m_time, source, target):
+        self._ensure_tables()
+        next_hops = self._next_hops[target]
+        if source != target and source not in next_hops:
+            return None
+
+        path = [self._graph.nodes[source]]
+        while source != target:
+            source = next_hops[source]
+            path.append(self._graph.nodes[source])
+        return path
@@ -1,3 +1,7 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+
 def cpu_by_priority(cpus, cpu_priorities):
     return sorted(cpus, key=lambda cpu: cpu_priorities.index(cpu))[0]
 
@@ -35,14 +39,87 @@ class NearestTransferCPUSelector:
 
 
 class ModellingTransferCPUSelector:
+    """
+    Tries the task on every CPU and picks the one where it starts first.
+    With workers > 1 the trials are split across that many processes, each holding
+    a replica of the scheduler whose System is kept in sync with the reservations
+    made since the last choose_cpu() call.
+    """
+    def __init__(self, *args, workers=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._workers = workers
+        self._pools = []
+        self._synced = 0
+
+    def schedule_dag(self):
+        if self._workers <= 1:
+            return super().schedule_dag()
+
+        self._synced = self._system.checkpoint()
+        replica = pickle.dumps(self)
+        self._pools = [ProcessPoolExecutor(max_workers=1, initializer=_init_replica, initargs=(replica,))
+                       for _ in range(self._workers)]
+        try:
+            return super().schedule_dag()
+        finally:
+            for pool in self._pools:
+                pool.shutdown()
+            self._pools = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pools"] = []
+        # replicas only run trials: they neither trace nor report progress
+        state["_tracer"] = None
+        state["progress"] = None
+        return state
+
     def choose_cpu(self, m_time, task):
-        cpu_times = {}
-        for cpu in self._system._cpus:
-            ready_time = self.schedule_transmits(task, m_time, cpu)
-            scheduled_task = self._system.schedule_calculation(task.n_id, ready_time, task.weight, cpu)
-            cpu_times[cpu] = scheduled_task.range[0]
-            self._system.cancel_session()
+        if self._pools:
+            cpu_times = self.parallel_trials(m_time, task)
+        else:
+            cpu_times = {cpu: self.try_cpu(m_time, task, cpu) for cpu in self._system._cpus}
 
         nearest_time = min(cpu_times.values())
         best_cpus = [cpu for cpu in cpu_times.keys() if cpu_times[cpu] == nearest_time]
         return cpu_by_priority(best_cpus, self.cpu_priorities())
+
+    def try_cpu(self, m_time, task, cpu):
+        """
+        Start time the task would get on cpu, the schedule is left as it was
+        """
+        with self.span("try_cpu", cpu=cpu) as span_args:
+            checkpoint = self._system.checkpoint()
+            ready_time = self.schedule_transmits(task, m_time, cpu)
+            scheduled_task = self._system.schedule_calculation(task.n_id, ready_time, task.weight, cpu)
+            self._system.rollback(checkpoint)
+            span_args["start"] = scheduled_task.range[0]
+        return scheduled_task.range[0]
+
+    def parallel_trials(self, m_time, task):
+        token = self._system.checkpoint()
+        assert token >= self._synced, "reservations known to the replicas were rolled back"
+        reservations = self._system.reservations(self._synced)
+        self._synced = token
+
+        cpus = list(self._system._cpus)
+        futures = [pool.submit(_replica_trials, reservations, m_time, task.n_id, cpus[i::len(self._pools)])
+                   for i, pool in enumerate(self._pools)]
+        cpu_times = {}
+        for future in futures:
+            cpu_times.update(future.result())
+        return {cpu: cpu_times[cpu] for cpu in cpus}
+
+
+_replica = None
+
+
+def _init_replica(replica):
+    global _replica
+    _replica = pickle.loads(replica)
+
+
+def _replica_trials(reservations, m_time, task_id, cpus):
+    _replica._system.replay(reservations)
+    task = _replica._dag.nodes[task_id]
+    return {cpu: _replica.try_cpu(m_time, task, cpu) for cpu in cpus}
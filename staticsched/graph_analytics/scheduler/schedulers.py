@@ -1,3 +1,5 @@
+from contextlib import nullcontext
+from heapq import heappop, heappush
 from staticsched.graph_analytics.cpu_priorities import BaseCPUPrioritizationPolicy
 from staticsched.graph_analytics.gantt import System
 from staticsched.graph_analytics.raw_graph import DAG, Graph
@@ -9,31 +11,76 @@ from staticsched.graph_analytics.scheduler.transmit_schedulers import NoAdvanceT
 from staticsched.graph_analytics.task_queues import BaseQueueGenerationPolicy
 
 
+class SchedulingCancelled(Exception):
+    """
+    Raised by schedule_dag() after BaseScheduler.cancel()
+    """
+    pass
+
+
 class TasksQueueController:
+    """
+    Tracks which tasks of the DAG are ready: every task counts its unfinished
+    parents, the counters are decremented as scheduled tasks finish and tasks
+    whose counter drops to zero go to a heap ordered by their position in the queue.
+    The scheduler reports every scheduled task with task_scheduled().
+    """
     def __init__(self, dag: DAG, tasks_queue, system):
         self._dag = dag
         self._queue = tasks_queue
 
         self._system = system
 
+        self._rank = {n_id: rank for rank, n_id in enumerate(tasks_queue)}
+        self._unfinished_parents = {}
+        self._ready = []
+        self._running = []
+        self._scheduled = set()
+        self._finished_count = 0
+        for node in dag.nodes.values():
+            self._unfinished_parents[node.n_id] = len(dag.edges_to_node(node))
+            if not self._unfinished_parents[node.n_id]:
+                heappush(self._ready, (self._rank[node.n_id], node.n_id))
+
+    def task_scheduled(self, task, scheduled_task):
+        self._scheduled.add(task.n_id)
+        heappush(self._running, (scheduled_task.range[1], task.n_id))
+
+    def _finish_tasks(self, m_time):
+        while self._running and self._running[0][0] <= m_time:
+            _, n_id = heappop(self._running)
+            self._finished_count += 1
+            for edge in self._dag.edges_from_node(self._dag.nodes[n_id]):
+                child_id = edge.target.n_id
+                self._unfinished_parents[child_id] -= 1
+                if not self._unfinished_parents[child_id]:
+                    heappush(self._ready, (self._rank[child_id], child_id))
+
+        # scheduled tasks are dropped once they reach the top of the heap
+        while self._ready and self._ready[0][1] in self._scheduled:
+            heappop(self._ready)
+
     def ready(self, m_time):
-        finished = self._system.finished_tasks(m_time)
-        scheduled = self._system.scheduled_tasks()
-        ready_nodes = []
-        for node in self._dag.nodes.values():
-            if node.n_id in scheduled:
-                continue
-
-            parents = self._dag.get_neighbours(node, forward=False)
-            if all((node.n_id in finished) for node in parents):
-                ready_nodes.append(node)
-        ready_nodes_sorted = sorted(ready_nodes,
-                                    key=lambda node: self._queue.index(node.n_id))
-        return ready_nodes_sorted
+        """
+        Tasks that are not scheduled yet and whose parents are all finished at m_time,
+        lazily in queue order
+        """
+        self._finish_tasks(m_time)
+
+        # walks the heap in sorted order without popping from it
+        heap = self._ready
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            (_, n_id), i = heappop(frontier)
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heappush(frontier, (heap[child], child))
+            if n_id not in self._scheduled:
+                yield self._dag.nodes[n_id]
 
     def done(self, m_time):
-        finished = self._system.finished_tasks(m_time)
-        return len(self._queue) <= len(finished)
+        self._finish_tasks(m_time)
+        return len(self._queue) <= self._finished_count
 
 
 class BaseScheduler:
@@ -41,37 +88,99 @@ class BaseScheduler:
                  queue_generation_policy: BaseQueueGenerationPolicy,
                  cpu_priorities_policy: BaseCPUPrioritizationPolicy,
                  system: System,
-                 router: Router):
+                 router: Router,
+                 event_driven=False,
+                 tracer=None,
+                 progress=None):
         self._system_graph = system_graph
         self._dag = dag
         self._queue_generation_policy = queue_generation_policy
         self._cpu_priorities_policy = cpu_priorities_policy
         self._system = system
         self._router = router
+        self._event_driven = event_driven
+        self._tracer = tracer
+        # progress(scheduled, total) is called after every scheduled task, set before schedule_dag()
+        self.progress = progress
+        self._cancelled = False
 
     def schedule_dag(self):
+        with self.span("schedule_dag", tasks=len(self._dag.nodes)):
+            self._schedule_dag()
+
+    def _schedule_dag(self):
         m_time = 0
-        task_queue = self.task_queue()
+        with self.phase("queue_generation"), self.span("queue_generation"):
+            task_queue = self.task_queue()
 
+        scheduled_count = 0
         while not task_queue.done(m_time):
-            ready_tasks = task_queue.ready(m_time)
-            while ready_tasks:
-                for task in ready_tasks:
-                    if self.schedule_task(m_time, task):
+            # ready() is a generator: it is asked again after every scheduled task
+            while True:
+                for task in task_queue.ready(m_time):
+                    if self._cancelled:
+                        raise SchedulingCancelled()
+                    scheduled_task = self.schedule_task(m_time, task)
+                    if scheduled_task:
+                        task_queue.task_scheduled(task, scheduled_task)
+                        scheduled_count += 1
+                        if self.progress:
+                            self.progress(scheduled_count, len(self._dag.nodes))
                         break
                 else:
                     break
-                ready_tasks = task_queue.ready(m_time)
 
-            m_time += 1
+            m_time = self.next_time(m_time)
+
+    def cancel(self):
+        """
+        Stops schedule_dag(), possibly running in another thread, before the next
+        task it tries: it raises SchedulingCancelled and the System is left half-filled
+        """
+        self._cancelled = True
+
+    def next_time(self, m_time):
+        """
+        Next tick to look at. In event driven mode ticks at which nothing starts or
+        ends are skipped: the ready tasks and free CPUs are the same as at m_time,
+        so the scheduler would do nothing there
+        """
+        if not self._event_driven:
+            return m_time + 1
+
+        next_time = self._system.next_event_time(m_time)
+        if next_time is None:
+            raise RuntimeError("Nothing is scheduled after {}, but DAG is not done".format(m_time))
+        return next_time
+
+    def phase(self, name):
+        """
+        Times the enclosed block as phase `name` if the System collects stats
+        """
+        if self._system.stats:
+            return self._system.stats.timer(name)
+        return nullcontext()
+
+    def span(self, name, **args):
+        """
+        Records the enclosed block in the trace if there is a tracer.
+        Yields the span args, results may be added to them.
+        """
+        if self._tracer:
+            return self._tracer.span(name, **args)
+        return nullcontext(args)
 
     def schedule_task(self, m_time, task):
-        chosen_cpu = self.choose_cpu(m_time, task)
-        if chosen_cpu:
-            m_time = self.schedule_transmits(task, m_time, chosen_cpu)
-            self._system.schedule_calculation(task.n_id, m_time, task.weight, chosen_cpu)
-            return True
-        return False
+        with self.span("schedule_task", task=task.n_id, m_time=m_time) as span_args:
+            with self.phase("choose_cpu"), self.span("choose_cpu"):
+                chosen_cpu = self.choose_cpu(m_time, task)
+            span_args["cpu"] = chosen_cpu
+            if chosen_cpu:
+                with self.phase("schedule_transmits"), self.span("schedule_transmits"):
+                    m_time = self.schedule_transmits(task, m_time, chosen_cpu)
+                with self.phase("schedule_calculation"), self.span("schedule_calculation"):
+                    return self._system.schedule_calculation(task.n_id, m_time, task.weight, chosen_cpu)
+            return False
 
     def choose_cpu(self, m_time, task):
         raise NotImplemented()
@@ -88,7 +197,10 @@ class BaseScheduler:
         return self._cpu_priorities_policy.get_priorities(self._system_graph)
 
     def get_route(self, m_time, source_cpu, target_cpu):
-        route = self._router.route(m_time, source_cpu, target_cpu)
+        if self._system.stats:
+            self._system.stats.count("router_lookups")
+        with self.span("route", source=source_cpu, target=target_cpu):
+            route = self._router.route(m_time, source_cpu, target_cpu)
         route = [node.n_id for node in route]
         route = list(zip(route, route[1:]))
         return route
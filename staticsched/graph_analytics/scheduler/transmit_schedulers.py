@@ -11,10 +11,12 @@ class NoAdvanceTransmissionScheduler:
         source_cpu = source_cpus[0].cpu_id
 
         route = self.get_route(m_time, source_cpu, target_cpu)
-        transmission = self._system.schedule_transmission(route,
-                                                          source_cpu, target_cpu,
-                                                          m_time,
-                                                          edge.source, edge.target, edge.weight)
+        with self.span("schedule_transmission", source=edge.source.n_id, target=edge.target.n_id,
+                       hops=len(route)):
+            transmission = self._system.schedule_transmission(route,
+                                                              source_cpu, target_cpu,
+                                                              m_time,
+                                                              edge.source, edge.target, edge.weight)
         return transmission
 
 
@@ -36,8 +38,10 @@ class AdvanceTransmissionScheduler:
 
         route = self.get_route(source_task_ready_time, source_cpu, target_cpu)
 
-        transmission = self._system.schedule_transmission(route,
-                                                          source_cpu, target_cpu,
-                                                          source_task_ready_time,
-                                                          edge.source, edge.target, edge.weight)
+        with self.span("schedule_transmission", source=edge.source.n_id, target=edge.target.n_id,
+                       hops=len(route)):
+            transmission = self._system.schedule_transmission(route,
+                                                              source_cpu, target_cpu,
+                                                              source_task_ready_time,
+                                                              edge.source, edge.target, edge.weight)
         return transmission
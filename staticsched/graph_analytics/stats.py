@@ -0,0 +1,27 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class Stats:
+    """
+    Call/probe counters and phase timers of a System, see System(collect_stats=True).
+    Instrumented code checks for None, so nothing is counted when stats are off.
+    """
+    def __init__(self):
+        self.counters = defaultdict(int)
+        self.timers = defaultdict(float)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    @contextmanager
+    def timer(self, name):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += perf_counter() - started
+
+    def as_dict(self):
+        return {"counters": dict(self.counters), "timers": dict(self.timers)}
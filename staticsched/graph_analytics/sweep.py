@@ -0,0 +1,246 @@
+"""
+Runs the scheduler experiment grid of test.py over a process pool.
+
+Every (configuration, run) cell is scheduled independently and written as one JSONL
+or CSV row as soon as it finishes, so an interrupted sweep is resumed by running it
+again with the same output file: completed cells are skipped.
+The DAG of a cell is generated from a seed derived from the cell itself, so
+results do not depend on the number of workers or the order cells finish in.
+
+    python -m staticsched.graph_analytics.sweep results.jsonl --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import warnings
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from hashlib import sha256
+from staticsched.graph_analytics.raw_graph import Graph, DAG
+from staticsched.graph_analytics.result_cache import ResultCache, schedule_key
+from staticsched.graph_analytics.scheduler.schedulers import AdvanceNeighbourScheduler, ModellingNeighbourScheduler
+from staticsched.graph_analytics.system_template import SystemTemplate
+from staticsched.graph_analytics.task_queues import QueueGenerationPolicy3, QueueGenerationPolicy4, \
+    QueueGenerationPolicy16
+
+
+QUEUES = {
+    "3": QueueGenerationPolicy3,
+    "4": QueueGenerationPolicy4,
+    "16": QueueGenerationPolicy16,
+}
+
+SCHEDULERS = {
+    "advance": AdvanceNeighbourScheduler,
+    "modelling": ModellingNeighbourScheduler,
+}
+
+# system is a path to a saved system graph, links (if not None) overrides links count of every CPU
+Cell = namedtuple("Cell", ["system", "links", "scale", "connectivity", "queue", "scheduler",
+                           "duplex", "io_cpu", "run"])
+
+RESULT_FIELDS = list(Cell._fields) + ["seed", "tasks", "duration_on_one_cpu", "duration",
+                                      "k_accel", "k_ef", "elapsed"]
+
+
+def grid(systems, scales, connectivities, queues, schedulers, duplex, io_cpu, runs):
+    """
+    Cells of the cartesian product of the parameters, `systems` are (path, links) pairs
+    """
+    for system, links in systems:
+        for scale in scales:
+            for connectivity in connectivities:
+                for queue in queues:
+                    for scheduler in schedulers:
+                        for is_duplex in duplex:
+                            for has_io_cpu in io_cpu:
+                                for run in range(runs):
+                                    yield Cell(system, links, scale, connectivity, queue, scheduler,
+                                               is_duplex, has_io_cpu, run)
+
+
+def cell_key(cell):
+    """
+    Identity of a cell or of a result row read back from a JSONL or CSV file
+    """
+    values = [cell[field] if isinstance(cell, dict) else getattr(cell, field) for field in Cell._fields]
+    # CSV writes None as an empty string
+    return tuple("" if value is None else str(value) for value in values)
+
+
+def cell_seed(cell, base_seed=0):
+    """
+    Seed of the DAG of a cell. Cells that differ only in queue, scheduler, duplex
+    or io_cpu get the same DAG, so their results are comparable.
+    """
+    key = repr((base_seed, cell.system, cell.links, cell.scale, cell.connectivity, cell.run))
+    return int.from_bytes(sha256(key.encode()).digest()[:8], "big")
+
+
+@lru_cache(maxsize=None)
+def system_template(system, links, duplex, io_cpu):
+    system_graph = Graph()
+    with open(system) as system_file:
+        override_node = {} if links is None else {"weight": links}
+        Graph.deserialize(system_graph, json.load(system_file), override_node=override_node)
+    return SystemTemplate(system_graph, duplex=duplex, has_io_cpu=io_cpu)
+
+
+def run_cell(cell, base_seed=0, cache_dir=None):
+    warnings.simplefilter("ignore")
+    started = time.perf_counter()
+    template = system_template(cell.system, cell.links, cell.duplex, cell.io_cpu)
+    seed = cell_seed(cell, base_seed)
+    count = len(template.graph.nodes) * cell.scale
+    task_dag = DAG.generate(min_weight=5, max_weight=20,
+                            count=count, connectivity=cell.connectivity,
+                            connections_percent=30, seed=seed)
+
+    def compute():
+        system = template.new_system()
+        scheduler = SCHEDULERS[cell.scheduler](task_dag, template.graph, QUEUES[cell.queue](),
+                                               template.cpu_priorities_policy, system, template.router,
+                                               event_driven=True)
+        scheduler.schedule_dag()
+        return dict(system.placement(), makespan=system.duration())
+
+    if cache_dir:
+        params = {"queue": cell.queue, "scheduler": cell.scheduler, "duplex": cell.duplex, "io_cpu": cell.io_cpu}
+        key = schedule_key(task_dag, template.graph, params)
+        makespan = ResultCache(cache_dir).get_or_compute(key, compute)["makespan"]
+    else:
+        makespan = compute()["makespan"]
+
+    result = cell._asdict()
+    result["seed"] = seed
+    result["tasks"] = count
+    result["duration_on_one_cpu"] = task_dag.duration_on_one_cpu()
+    result["duration"] = makespan
+    result["k_accel"] = result["duration_on_one_cpu"] / result["duration"]
+    result["k_ef"] = result["k_accel"] / len(template.graph.nodes)
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+
+class ResultsFile:
+    """
+    Append-only JSONL (or CSV, by the .csv extension) file of cell results
+    """
+    def __init__(self, path):
+        self.path = path
+        self.is_csv = path.endswith(".csv")
+
+    def _drop_partial_line(self):
+        # a sweep killed in the middle of a write leaves an unterminated last line
+        with open(self.path, "rb+") as results:
+            data = results.read()
+            if data and not data.endswith(b"\n"):
+                results.truncate(data.rfind(b"\n") + 1)
+
+    def rows(self):
+        if not os.path.exists(self.path):
+            return []
+        self._drop_partial_line()
+        with open(self.path, newline="") as results:
+            if self.is_csv:
+                return list(csv.DictReader(results))
+            return [json.loads(line) for line in results if line.strip()]
+
+    def completed(self):
+        return {cell_key(row) for row in self.rows()}
+
+    def append(self, result):
+        is_new = not os.path.exists(self.path) or not os.path.getsize(self.path)
+        with open(self.path, "a", newline="") as results:
+            if self.is_csv:
+                writer = csv.DictWriter(results, RESULT_FIELDS)
+                if is_new:
+                    writer.writeheader()
+                writer.writerow(result)
+            else:
+                results.write(json.dumps(result) + "\n")
+
+
+def run_sweep(cells, output, workers=None, base_seed=0, cache_dir=None):
+    """
+    Runs the cells missing from `output` and appends their results to it as they finish.
+    A failed cell is reported on stderr and left out of `output`, so the next run retries it.
+    Returns the number of cells completed.
+    """
+    results = ResultsFile(output)
+    completed = results.completed()
+    cells = [cell for cell in cells if cell_key(cell) not in completed]
+    if not cells:
+        return 0
+
+    completed_count = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_cell, cell, base_seed, cache_dir): cell for cell in cells}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exception:
+                print("cell {} failed: {!r}".format(futures[future], exception), file=sys.stderr)
+                continue
+            results.append(result)
+            completed_count += 1
+    return completed_count
+
+
+def summarize(rows):
+    """
+    Average k_accel and k_ef over the runs of every configuration, as test.loop() prints them
+    """
+    totals = {}
+    for row in rows:
+        configuration = cell_key(row)[:-1]
+        accel, ef, runs = totals.get(configuration, (0, 0, 0))
+        totals[configuration] = accel + float(row["k_accel"]), ef + float(row["k_ef"]), runs + 1
+    return {configuration: (accel / runs, ef / runs) for configuration, (accel, ef, runs) in totals.items()}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Runs the scheduler experiment grid")
+    parser.add_argument("output", help="results file, .jsonl or .csv")
+    parser.add_argument("--system", action="append", default=None,
+                        help="saved system graph, optionally with links count: saved/thor:3")
+    parser.add_argument("--scale", type=int, action="append", default=None)
+    parser.add_argument("--connectivity", type=float, action="append", default=None)
+    parser.add_argument("--queue", action="append", default=None, choices=sorted(QUEUES))
+    parser.add_argument("--scheduler", action="append", default=None, choices=sorted(SCHEDULERS))
+    parser.add_argument("--duplex", action="append", default=None, choices=["on", "off"],
+                        help="repeat to sweep both settings, on by default")
+    parser.add_argument("--io-cpu", action="append", default=None, choices=["on", "off"],
+                        help="repeat to sweep both settings, on by default")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", default=None, help="directory of cached schedules shared between sweeps")
+    args = parser.parse_args(args)
+
+    systems = []
+    for system in args.system or ["saved/thor:3"]:
+        path, _, links = system.partition(":")
+        systems.append((path, int(links) if links else None))
+
+    cells = grid(systems,
+                 scales=args.scale or [3],
+                 connectivities=args.connectivity or [i / 10 for i in range(1, 10)],
+                 queues=args.queue or ["3", "4"],
+                 schedulers=args.scheduler or ["modelling"],
+                 duplex=[value == "on" for value in args.duplex or ["on"]],
+                 io_cpu=[value == "on" for value in args.io_cpu or ["on"]],
+                 runs=args.runs)
+    ran = run_sweep(cells, args.output, workers=args.workers, base_seed=args.seed, cache_dir=args.cache)
+    print("{} cells completed".format(ran))
+
+    for configuration, (accel, ef) in sorted(summarize(ResultsFile(args.output).rows()).items()):
+        print("{}: {}, {}".format(", ".join(configuration), accel, ef))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from staticsched.graph_analytics.cpu_priorities import CohesionCPUPrioritizationPolicy, FixedCPUPrioritizationPolicy
+from staticsched.graph_analytics.gantt import System
+from staticsched.graph_analytics.raw_graph import Graph
+from staticsched.graph_analytics.router import BFSRouter
+
+
+class SystemTemplate:
+    """
+    Everything about a system topology that does not depend on the schedule:
+    CPU/link layout, routing tables and CPU priorities.
+    Built once per topology, it hands out empty Systems for any number of DAGs.
+    The system graph must not be changed while the template is in use.
+    """
+    def __init__(self, graph: Graph, duplex, has_io_cpu, cpu_priorities_policy=None):
+        self.graph = graph
+        self.duplex = duplex
+        self.has_io_cpu = has_io_cpu
+        self.layout = System.layout(graph)
+        self.router = BFSRouter(graph)
+
+        if cpu_priorities_policy is None:
+            cpu_priorities_policy = CohesionCPUPrioritizationPolicy()
+        self.cpu_priorities_policy = FixedCPUPrioritizationPolicy(cpu_priorities_policy.get_priorities(graph))
+
+    def new_system(self, collect_stats=False):
+        return System(self.graph, duplex=self.duplex, has_io_cpu=self.has_io_cpu, layout=self.layout,
+                      collect_stats=collect_stats)
+
+    def scheduler(self, scheduler_class, dag, queue_generation_policy, collect_stats=False, **kwargs):
+        """
+        A scheduler of `scheduler_class` for `dag` on a new empty System
+        """
+        return scheduler_class(dag, self.graph, queue_generation_policy, self.cpu_priorities_policy,
+                               self.new_system(collect_stats), self.router, **kwargs)
@@ -11,15 +11,11 @@ class QueueGenerationPolicy2(BaseQueueGenerationPolicy):
         paths_down = find_all_critical_paths(dag, forward=True, weight_based=True)
         paths_up = find_all_critical_paths(dag, forward=False, weight_based=True)
 
-        def get_weight(item):
-            node_id, (weight, path) = item
-            return weight, node_id
-
-        _, (max_critical_path_weight, _) = max(paths_down.items(), key=get_weight)
+        max_critical_path_weight = paths_down.max_length()
 
         def difference(node_id):
-            early_time, _ = paths_up[node_id]
-            later_time, _ = paths_down[node_id]
+            early_time = paths_up.length(node_id)
+            later_time = paths_down.length(node_id)
             return max_critical_path_weight - early_time - later_time
 
         return [node for node in sorted(dag.nodes.keys(), key=difference)]
@@ -29,21 +25,19 @@ class QueueGenerationPolicy3(BaseQueueGenerationPolicy):
     def get_queue(self, dag):
         paths = find_all_critical_paths(dag, forward=True, weight_based=True)
 
-        def get_weight(item):
-            node_id, (weight, path) = item
-            return weight, node_id
-        return [path[0] for path in sorted(paths.items(), key=get_weight, reverse=True)]
+        def get_weight(node_id):
+            return paths.length(node_id), node_id
+        return sorted(dag.nodes.keys(), key=get_weight, reverse=True)
 
 
 class QueueGenerationPolicy4(BaseQueueGenerationPolicy):
     def get_queue(self, dag):
         paths = find_all_critical_paths(dag, forward=True, weight_based=False)
 
-        def get_weight(item):
-            node_id, (weight, path) = item
+        def get_weight(node_id):
             node = dag.nodes[node_id]
-            return weight, len(dag.get_neighbours(node, forward=True) + dag.get_neighbours(node, forward=False))
-        return [path[0] for path in sorted(paths.items(), key=get_weight, reverse=True)]
+            return paths.length(node_id), len(dag.get_neighbours(node, forward=True) + dag.get_neighbours(node, forward=False))
+        return sorted(dag.nodes.keys(), key=get_weight, reverse=True)
 
 
 class QueueGenerationPolicy12(BaseQueueGenerationPolicy):
@@ -57,8 +51,4 @@ class QueueGenerationPolicy12(BaseQueueGenerationPolicy):
 class QueueGenerationPolicy16(BaseQueueGenerationPolicy):
     def get_queue(self, dag):
         paths = find_all_critical_paths(dag, forward=False, weight_based=True)
-
-        def get_weight(item):
-            node_id, (weight, path) = item
-            return weight
-        return [path[0] for path in sorted(paths.items(), key=get_weight)]
+        return sorted(dag.nodes.keys(), key=paths.length)
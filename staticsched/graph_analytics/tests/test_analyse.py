@@ -0,0 +1,83 @@
+from unittest import TestCase
+from staticsched.graph_analytics.analyse import find_all_critical_paths, find_critical_path, get_analysis
+from staticsched.graph_analytics.raw_graph import DAG
+
+
+class TestCriticalPaths(TestCase):
+    def setUp(self):
+        #   a(1) -> b(5) -> d(1)
+        #     \---> c(2) --/
+        self.dag = DAG()
+        for n_id, weight in zip("abcd", (1, 5, 2, 1)):
+            self.dag.add_node(0, 0, weight, n_id)
+        self.dag.add_edge("a", "c", 1)
+        self.dag.add_edge("a", "b", 1)
+        self.dag.add_edge("b", "d", 1)
+        self.dag.add_edge("c", "d", 1)
+
+    def test_forward(self):
+        paths = find_all_critical_paths(self.dag, forward=True, weight_based=True)
+        self.assertEqual(dict(paths), {"a": (7, ["a", "b", "d"]),
+                                       "b": (6, ["b", "d"]),
+                                       "c": (3, ["c", "d"]),
+                                       "d": (1, ["d"])})
+        self.assertEqual(find_critical_path(self.dag), (7, ["a", "b", "d"]))
+
+    def test_backward(self):
+        paths = find_all_critical_paths(self.dag, forward=False, weight_based=True)
+        self.assertEqual(dict(paths), {"a": (0, []),
+                                       "b": (1, ["a"]),
+                                       "c": (1, ["a"]),
+                                       "d": (6, ["b", "a"])})
+
+    def test_ties_keep_edge_order(self):
+        paths = find_all_critical_paths(self.dag, forward=True, weight_based=False)
+        # both children of "a" are 2 nodes deep, the first added edge wins
+        self.assertEqual(paths["a"], (3, ["a", "c", "d"]))
+
+    def test_deep_chain(self):
+        dag = DAG()
+        depth = 20000
+        for i in range(depth):
+            dag.add_node(0, 0, 1, str(i))
+        for i in range(depth - 1):
+            dag.add_edge(str(i), str(i + 1), 1)
+        length, path = find_critical_path(dag)
+        self.assertEqual(length, depth)
+        self.assertEqual(len(path), depth)
+
+    def test_cycle(self):
+        self.dag.add_edge("d", "a", 1)
+        self.assertRaises(ValueError, find_all_critical_paths, self.dag, True, True)
+
+
+class TestGraphAnalysis(TestCase):
+    def setUp(self):
+        self.dag = DAG()
+        self.a = self.dag.add_node(0, 0, 2, "a")
+        self.b = self.dag.add_node(0, 0, 3, "b")
+        self.edge = self.dag.add_edge("a", "b", 1)
+
+    def test_repeated_queries_are_cached(self):
+        analysis = get_analysis(self.dag)
+        self.assertIs(analysis, get_analysis(self.dag))
+        self.assertIs(find_all_critical_paths(self.dag, True, True),
+                      find_all_critical_paths(self.dag, True, True))
+        self.assertEqual(analysis.top_levels(), {"a": 0, "b": 2})
+        self.assertEqual(analysis.bottom_levels(), {"a": 5, "b": 3})
+        self.assertEqual(analysis.levels(), [["a"], ["b"]])
+
+    def test_changes_invalidate(self):
+        analysis = get_analysis(self.dag)
+        self.assertEqual(analysis.bottom_levels()["a"], 5)
+
+        self.b.weight = 10
+        self.assertEqual(analysis.bottom_levels()["a"], 12)
+
+        self.dag.add_node(0, 0, 20, "c")
+        self.dag.add_edge("a", "c", 1)
+        self.assertEqual(analysis.bottom_levels()["a"], 22)
+
+        version = self.dag.version
+        self.edge.weight = 5
+        self.assertGreater(self.dag.version, version)
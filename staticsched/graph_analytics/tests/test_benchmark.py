@@ -0,0 +1,23 @@
+from unittest import TestCase
+from staticsched.graph_analytics.benchmark import cases, run_benchmarks, compare, mesh_system
+
+
+class TestBenchmark(TestCase):
+    def test_run(self):
+        selected = [case for case in cases(sizes=[50], topologies=["ring16"])
+                    if case.name in ("critical_paths/50", "route/bfs/ring16", "schedule/advance/ring16/50")]
+        self.assertEqual(len(selected), 3)
+        results = run_benchmarks(selected, repeat=1)["results"]
+        self.assertGreater(results["critical_paths/50"]["tasks_per_second"], 0)
+        self.assertGreater(results["schedule/advance/ring16/50"]["peak_bytes"], 0)
+        self.assertNotIn("tasks_per_second", results["route/bfs/ring16"])
+
+    def test_compare(self):
+        baseline = {"results": {"a": {"seconds": 1.0, "peak_bytes": 100}, "b": {"seconds": 1.0}}}
+        current = {"results": {"a": {"seconds": 1.1, "peak_bytes": 200}, "b": {"seconds": 2.0}, "c": {"seconds": 5}}}
+        self.assertEqual(compare(baseline, current, threshold=0.25),
+                         [("a", "peak_bytes", 100, 200), ("b", "seconds", 1.0, 2.0)])
+
+    def test_mesh(self):
+        mesh = mesh_system(3, 2)
+        self.assertEqual(len(mesh.edges), 7)
@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+
+
+class TestCLI(TestCase):
+    def test_schedule(self):
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, "schedule.json")
+            script = ("import sys\n"
+                      "from staticsched.__main__ import main\n"
+                      "main(['schedule', 'saved/test1', 'saved/thor', '--links', '3', '--output', {!r}])\n"
+                      "assert 'tkinter' not in sys.modules and 'matplotlib' not in sys.modules\n").format(output)
+            process = subprocess.run([sys.executable, "-c", script], cwd=ROOT,
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+            self.assertEqual(process.returncode, 0, process.stderr)
+            self.assertIn("makespan: ", process.stdout)
+
+            with open(output) as schedule:
+                result = json.load(schedule)
+            self.assertEqual(result["makespan"], max(task["end"] for task in result["tasks"]))
+            self.assertEqual(sorted(task["task"] for task in result["tasks"]), ["0", "1", "2", "3", "4"])
+
+    def test_workers_need_modelling(self):
+        process = subprocess.run([sys.executable, "-m", "staticsched", "schedule", "saved/test1", "saved/thor",
+                                  "--links", "3", "--workers", "2"], cwd=ROOT,
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(process.returncode, 2)
+        self.assertIn("--workers needs --scheduler modelling", process.stderr)
@@ -0,0 +1,42 @@
+from unittest import TestCase
+from staticsched.graph_analytics.analyse import find_all_critical_paths, find_critical_path
+from staticsched.graph_analytics.compact_graph import CompactDAG
+from staticsched.graph_analytics.raw_graph import DAG
+from staticsched.graph_analytics.task_queues import QueueGenerationPolicy2, QueueGenerationPolicy3, \
+    QueueGenerationPolicy4, QueueGenerationPolicy12, QueueGenerationPolicy16
+
+
+class TestCompactDAG(TestCase):
+    def setUp(self):
+        #   a -> c -> d
+        #   b --/ \-> e
+        self.dag = DAG()
+        for weight, n_id in enumerate("abcde", start=1):
+            self.dag.add_node(weight * 10, 0, weight, n_id)
+        self.dag.add_edge("c", "e", 4)
+        self.dag.add_edge("a", "c", 1)
+        self.dag.add_edge("b", "c", 2)
+        self.dag.add_edge("c", "d", 3)
+        self.compact = CompactDAG.from_graph(self.dag)
+
+    def test_layout(self):
+        c = self.compact.index["c"]
+        self.assertEqual([self.compact.node_ids[i] for i in self.compact.successors(c)], ["e", "d"])
+        self.assertEqual([self.compact.node_ids[i] for i in self.compact.predecessors(c)], ["a", "b"])
+        self.assertEqual(list(self.compact.weights), [1, 2, 3, 4, 5])
+
+    def test_round_trip(self):
+        restored = self.compact.to_graph()
+        self.assertEqual(restored.serialize(), self.dag.serialize())
+
+    def test_analysis(self):
+        for forward in (True, False):
+            for weight_based in (True, False):
+                self.assertEqual(find_all_critical_paths(self.compact, forward, weight_based),
+                                 find_all_critical_paths(self.dag, forward, weight_based))
+        self.assertEqual(find_critical_path(self.compact), find_critical_path(self.dag))
+
+    def test_queues(self):
+        for policy in (QueueGenerationPolicy2, QueueGenerationPolicy3, QueueGenerationPolicy4,
+                       QueueGenerationPolicy12, QueueGenerationPolicy16):
+            self.assertEqual(policy().get_queue(self.compact), policy().get_queue(self.dag))
@@ -0,0 +1,123 @@
+from unittest import TestCase
+from staticsched.graph_analytics.gantt import Timeline, ScheduledTask, CPU, System
+from staticsched.graph_analytics.raw_graph import Graph
+
+
+class TestTimeline(TestCase):
+    def setUp(self):
+        self.timeline = Timeline()
+        self.tasks = [ScheduledTask(str(i), start, end, None) for i, (start, end) in enumerate([(2, 4), (6, 7), (7, 10)])]
+        for task in self.tasks:
+            self.timeline.add(task)
+
+    def test_item_at(self):
+        self.assertIsNone(self.timeline.item_at(1))
+        self.assertIs(self.timeline.item_at(2), self.tasks[0])
+        self.assertIsNone(self.timeline.item_at(4))
+        self.assertIs(self.timeline.item_at(7), self.tasks[2])
+
+    def test_is_free(self):
+        self.assertTrue(self.timeline.is_free(0, 2))
+        self.assertFalse(self.timeline.is_free(0, 3))
+        self.assertTrue(self.timeline.is_free(4, 2))
+        self.assertFalse(self.timeline.is_free(5, 2))
+        self.assertTrue(self.timeline.is_free(10, 100))
+        self.assertTrue(self.timeline.is_free(3, 0))
+
+    def test_next_gap(self):
+        self.assertEqual(self.timeline.next_gap(0, 2), 0)
+        self.assertEqual(self.timeline.next_gap(0, 3), 10)
+        self.assertEqual(self.timeline.next_gap(3, 2), 4)
+        self.assertEqual(self.timeline.next_gap(8, 1), 10)
+
+    def test_remove(self):
+        self.timeline.remove(self.tasks[1])
+        self.assertTrue(self.timeline.is_free(4, 3))
+        self.assertEqual(self.timeline.boundaries(0, 20), [2, 4, 7, 10])
+
+
+class TestCPUOccupancy(TestCase):
+    def test_same_as_tick_scan(self):
+        for links, duplex, has_io_cpu in [(2, True, True), (2, False, True), (1, True, False)]:
+            cpu = CPU("0", links=links, duplex=duplex, has_io_cpu=has_io_cpu)
+            cpu.schedule_calculation("a", 8, 2)
+            cpu.schedule_transmission(None, 2, 3, 0, "1")
+            cpu.schedule_transmission(None, 5, 2, 1, "1")
+            self.check_against_ticks(cpu)
+
+    def check_against_ticks(self, cpu):
+        for m_time in range(12):
+            for duration in range(1, 6):
+                ticks = range(m_time, m_time + duration)
+                self.assertEqual(cpu.is_alu_free_duration(m_time, duration),
+                                 all(cpu.is_alu_free(tick) for tick in ticks))
+                for direction in (0, 1):
+                    for peer in ("1", "2"):
+                        alu_free = cpu._has_io_cpu or all(cpu.is_alu_free(tick) for tick in ticks)
+                        self.assertEqual(cpu.has_free_link(m_time, duration, direction, peer),
+                                         alu_free and any(all(link.is_link_free(tick, direction, peer)
+                                                              for tick in ticks)
+                                                          for link in cpu._links))
+
+
+class TestEarliestSlot(TestCase):
+    def test_same_as_tick_scan(self):
+        for links, duplex, has_io_cpu in [(2, True, True), (2, False, True), (1, True, False)]:
+            source = CPU("0", links=links, duplex=duplex, has_io_cpu=has_io_cpu)
+            target = CPU("1", links=links, duplex=duplex, has_io_cpu=has_io_cpu)
+            source.schedule_calculation("a", 8, 2)
+            source.schedule_transmission(None, 2, 3, 0, "1")
+            source.schedule_transmission(None, 5, 2, 1, "2")
+            target.schedule_calculation("b", 0, 3)
+            target.schedule_transmission(None, 4, 4, 0, "2")
+            target.schedule_transmission(None, 11, 1, 1, "0")
+            for after in range(14):
+                for duration in range(1, 6):
+                    m_time = after
+                    while not source.is_alu_free_duration(m_time, duration):
+                        m_time += 1
+                    self.assertEqual(System.earliest_slot(source, after, duration), m_time)
+
+                    m_time = after
+                    while not (source.has_free_link(m_time, duration, 1, "1") and
+                               target.has_free_link(m_time, duration, 0, "0")):
+                        m_time += 1
+                    self.assertEqual(System.earliest_slot(source, after, duration, 1, target), m_time)
+
+
+class TestSystemRollback(TestCase):
+    def setUp(self):
+        system_graph = Graph()
+        for n_id in "012":
+            system_graph.add_node(0, 0, 2, n_id)
+        system_graph.add_edge("0", "1", 1)
+        system_graph.add_edge("1", "2", 1)
+        self.system = System(system_graph, duplex=True, has_io_cpu=True)
+        self.system.schedule_calculation("a", 0, 2, "0")
+
+    def state(self):
+        return [(cpu.cpu_id, [task.range for task in cpu._alu_tasks],
+                 [[segment.range for segment in link._io_tasks] for link in cpu._links])
+                for cpu in self.system._cpus.values()]
+
+    def test_rollback(self):
+        before = self.state()
+        token = self.system.checkpoint()
+        self.system.schedule_transmission([("0", "1"), ("1", "2")], "0", "2", 2, "a", "b", 3)
+        self.system.schedule_calculation("b", 8, 1, "2")
+        self.assertTrue(self.system.cpus_by_scheduled_task("b"))
+        self.system.rollback(token)
+
+        self.assertEqual(self.state(), before)
+        self.assertFalse(self.system.cpus_by_scheduled_task("b"))
+        self.assertEqual(self.system.schedule_calculation("b", 0, 1, "2").range, (0, 1))
+
+    def test_nested(self):
+        outer = self.system.checkpoint()
+        self.system.schedule_calculation("b", 2, 2, "0")
+        inner = self.system.checkpoint()
+        self.system.schedule_calculation("c", 4, 2, "0")
+        self.system.rollback(inner)
+        self.assertEqual(self.system.scheduled_tasks(), ["a", "b"])
+        self.system.rollback(outer)
+        self.assertEqual(self.system.scheduled_tasks(), ["a"])
@@ -0,0 +1,96 @@
+from random import Random
+from unittest import TestCase
+import warnings
+from staticsched.graph_analytics.raw_graph import DAG, Graph, _pair_from_index, _sample_indices
+
+
+class TestAdjacencyIndex(TestCase):
+    def setUp(self):
+        #   a -> b -> d
+        #    \-> c -/
+        self.dag = DAG()
+        for n_id in "abcd":
+            self.dag.add_node(0, 0, 1, n_id)
+        self.ab = self.dag.add_edge("a", "b", 1)
+        self.ac = self.dag.add_edge("a", "c", 2)
+        self.bd = self.dag.add_edge("b", "d", 3)
+        self.cd = self.dag.add_edge("c", "d", 4)
+
+    def neighbour_ids(self, n_id, forward=True):
+        return [node.n_id for node in self.dag.get_neighbours(self.dag.nodes[n_id], forward=forward)]
+
+    def test_neighbours(self):
+        self.assertEqual(self.neighbour_ids("a"), ["b", "c"])
+        self.assertEqual(self.neighbour_ids("d", forward=False), ["b", "c"])
+        self.assertEqual(self.dag.edges_to_node(self.dag.nodes["d"]), [self.bd, self.cd])
+        self.assertEqual(self.dag.edges_from_node(self.dag.nodes["a"]), [self.ab, self.ac])
+
+    def test_delete_edge(self):
+        self.dag.delete_edge(self.ab)
+        self.assertEqual(self.neighbour_ids("a"), ["c"])
+        self.assertEqual(self.neighbour_ids("b", forward=False), [])
+        self.assertNotIn(self.ab, self.dag.edges)
+        # deleting twice is a no-op
+        self.dag.delete_edge(self.ab)
+
+    def test_delete_node(self):
+        self.dag.delete_node("c")
+        self.assertEqual(self.neighbour_ids("a"), ["b"])
+        self.assertEqual(self.neighbour_ids("d", forward=False), ["b"])
+        self.assertEqual(self.dag.edges, [self.ab, self.bd])
+
+    def test_undirected_neighbours(self):
+        graph = Graph()
+        for n_id in "xyz":
+            graph.add_node(0, 0, 1, n_id)
+        graph.add_edge("y", "x", 1)
+        graph.add_edge("x", "z", 1)
+        neighbours = graph.get_neighbours(graph.nodes["x"])
+        self.assertEqual([node.n_id for node in neighbours], ["y", "z"])
+
+
+class TestLevels(TestCase):
+    def test_levels(self):
+        #   b -> a -> d
+        #   c ------/
+        dag = DAG()
+        for n_id in "abcd":
+            dag.add_node(0, 0, 1, n_id)
+        dag.add_edge("b", "a", 1)
+        dag.add_edge("a", "d", 1)
+        dag.add_edge("c", "d", 1)
+        self.assertEqual(dag.levels(), [["b", "c"], ["a"], ["d"]])
+
+    def test_levels_cycle(self):
+        dag = DAG()
+        for n_id in "abc":
+            dag.add_node(0, 0, 1, n_id)
+        dag.add_edge("a", "b", 1)
+        dag.add_edge("b", "c", 1)
+        dag.add_edge("c", "b", 1)
+        self.assertRaises(ValueError, dag.levels)
+
+
+class TestGenerate(TestCase):
+    def test_pair_from_index(self):
+        for count in range(2, 12):
+            pairs = [(i, j) for i in range(count) for j in range(i + 1, count)]
+            self.assertEqual([_pair_from_index(index, count) for index in range(len(pairs))], pairs)
+
+    def test_sample_indices(self):
+        rng = Random(1)
+        for k in (0, 3, 10, 17, 20):
+            sample = _sample_indices(rng, 20, k)
+            self.assertEqual(len(sample), k)
+            self.assertEqual(len(set(sample)), k)
+            self.assertTrue(all(0 <= index < 20 for index in sample))
+
+    def test_generate_seed(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            first = DAG.generate(5, 20, 40, 0.5, 30, seed=7)
+            second = DAG.generate(5, 20, 40, 0.5, 30, seed=7)
+        self.assertEqual(first.serialize(), second.serialize())
+        self.assertEqual(len(first.edges), int(30 / 100 * 40 * 39 // 2))
+        self.assertTrue(all(int(edge.source.n_id) < int(edge.target.n_id) for edge in first.edges))
+        self.assertEqual(sum(len(level) for level in first.levels()), 40)
@@ -0,0 +1,47 @@
+import os
+import time
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from staticsched.graph_analytics.raw_graph import DAG
+from staticsched.graph_analytics.result_cache import ResultCache, schedule_key
+from staticsched.graph_analytics.tests.test_schedulers import ring_system
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.dag = DAG.generate(5, 20, 10, 0.5, 30, 1, 10, seed=1)
+        self.system_graph = ring_system(3)
+        self.params = {"queue": "3", "scheduler": "advance", "duplex": True, "io_cpu": True}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key(self):
+        key = schedule_key(self.dag, self.system_graph, self.params)
+        same_dag = DAG.generate(5, 20, 10, 0.5, 30, 1, 10, seed=1)
+        next(iter(same_dag.nodes.values())).x += 100
+        self.assertEqual(schedule_key(same_dag, self.system_graph, dict(self.params)), key)
+        self.assertNotEqual(schedule_key(self.dag, self.system_graph, dict(self.params, duplex=False)), key)
+        next(iter(same_dag.nodes.values())).weight += 1
+        self.assertNotEqual(schedule_key(same_dag, self.system_graph, self.params), key)
+
+    def test_get_or_compute(self):
+        cache = ResultCache(self.directory.name)
+        calls = []
+        compute = lambda: calls.append(1) or {"makespan": 10}
+        key = schedule_key(self.dag, self.system_graph, self.params)
+        self.assertEqual(cache.get_or_compute(key, compute), {"makespan": 10})
+        self.assertEqual(cache.get_or_compute(key, compute), {"makespan": 10})
+        self.assertEqual(len(calls), 1)
+
+    def test_lru_eviction(self):
+        cache = ResultCache(self.directory.name, max_bytes=140)
+        result = {"tasks": "x" * 30}
+        for key in "abc":
+            cache.put(key, result)
+            time.sleep(0.01)
+        self.assertIsNotNone(cache.get("a"))
+        time.sleep(0.01)
+        cache.put("d", result)
+        self.assertEqual(sorted(os.path.basename(path) for _, _, path in cache.entries()), ["a.json", "c.json", "d.json"])
@@ -0,0 +1,39 @@
+from unittest import TestCase
+from staticsched.graph_analytics.raw_graph import Graph
+from staticsched.graph_analytics.router import DFSRouter, BFSRouter
+
+
+def route_ids(router, source, target):
+    route = router.route(0, source, target)
+    return route and [node.n_id for node in route]
+
+
+class TestBFSRouter(TestCase):
+    def setUp(self):
+        # 0 - 1 - 2
+        # |   |   |
+        # 3 - 4 - 5    6
+        self.graph = Graph()
+        for i in range(7):
+            self.graph.add_node(0, 0, 1, str(i))
+        for source, target in [(0, 1), (1, 2), (0, 3), (1, 4), (2, 5), (3, 4), (4, 5)]:
+            self.graph.add_edge(str(source), str(target), 1)
+
+    def test_same_routes_as_dfs(self):
+        dfs, bfs = DFSRouter(self.graph), BFSRouter(self.graph)
+        for source in self.graph.nodes:
+            for target in self.graph.nodes:
+                self.assertEqual(route_ids(bfs, source, target), route_ids(dfs, source, target))
+
+    def test_routes(self):
+        router = BFSRouter(self.graph)
+        # two shortest paths, the first neighbour of "0" wins
+        self.assertEqual(route_ids(router, "0", "4"), ["0", "1", "4"])
+        self.assertEqual(route_ids(router, "3", "3"), ["3"])
+        self.assertIsNone(router.route(0, "0", "6"))
+        self.assertEqual(router.distance("0", "5"), 3)
+
+    def test_rebuilds_after_change(self):
+        router = BFSRouter(self.graph)
+        self.graph.add_edge("0", "5", 1)
+        self.assertEqual(route_ids(router, "0", "5"), ["0", "5"])
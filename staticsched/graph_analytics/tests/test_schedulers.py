@@ -0,0 +1,143 @@
+from unittest import TestCase
+from staticsched.graph_analytics.cpu_priorities import CohesionCPUPrioritizationPolicy
+from staticsched.graph_analytics.gantt import System
+from staticsched.graph_analytics.raw_graph import DAG, Graph
+from staticsched.graph_analytics.router import BFSRouter
+from staticsched.graph_analytics.scheduler.schedulers import AdvanceNeighbourScheduler, ModellingNeighbourScheduler, \
+    SchedulingCancelled, TasksQueueController
+from staticsched.graph_analytics.task_queues import QueueGenerationPolicy3
+from staticsched.graph_analytics.trace import Tracer
+
+
+def ring_system(size):
+    system_graph = Graph()
+    for i in range(size):
+        system_graph.add_node(0, 0, 2, str(i))
+    for i in range(size):
+        system_graph.add_edge(str(i), str((i + 1) % size), 1)
+    return system_graph
+
+
+def schedule(dag, system_graph, scheduler_class, collect_stats=False, **kwargs):
+    system = System(system_graph, duplex=True, has_io_cpu=True, collect_stats=collect_stats)
+    scheduler = scheduler_class(dag, system_graph, QueueGenerationPolicy3(), CohesionCPUPrioritizationPolicy(),
+                                system, BFSRouter(system_graph), **kwargs)
+    scheduler.schedule_dag()
+    return system
+
+
+def placement(system):
+    return sorted((task.task_name, cpu.cpu_id, task.range)
+                  for cpu in system._cpus.values() for task in cpu._alu_tasks)
+
+
+class TestEventDriven(TestCase):
+    def test_same_schedule(self):
+        dag = DAG.generate(20, 90, 20, 0.6, 20, 1, 50, seed=3)
+        system_graph = ring_system(4)
+        for scheduler_class in (AdvanceNeighbourScheduler, ModellingNeighbourScheduler):
+            by_tick = schedule(dag, system_graph, scheduler_class)
+            by_event = schedule(dag, system_graph, scheduler_class, event_driven=True)
+            self.assertEqual(placement(by_event), placement(by_tick))
+            self.assertEqual(by_event.duration(), by_tick.duration())
+
+
+class TestParallelTrials(TestCase):
+    def test_same_schedule(self):
+        dag = DAG.generate(5, 20, 25, 0.5, 30, 1, 10, seed=5)
+        system_graph = ring_system(5)
+        serial = schedule(dag, system_graph, ModellingNeighbourScheduler, event_driven=True)
+        parallel = schedule(dag, system_graph, ModellingNeighbourScheduler, event_driven=True, workers=2)
+        self.assertEqual(placement(parallel), placement(serial))
+
+
+class TestStats(TestCase):
+    def test_stats(self):
+        dag = DAG.generate(5, 20, 15, 0.5, 30, 1, 10, seed=4)
+        system_graph = ring_system(4)
+        plain = schedule(dag, system_graph, ModellingNeighbourScheduler)
+        self.assertIsNone(plain.stats)
+
+        system = schedule(dag, system_graph, ModellingNeighbourScheduler, collect_stats=True)
+        self.assertEqual(placement(system), placement(plain))
+        stats = system.stats.as_dict()
+        # one trial per CPU and task, every trial is rolled back
+        self.assertEqual(stats["counters"]["rollbacks"], 4 * len(dag.nodes))
+        self.assertEqual(stats["counters"]["find_calculation_time_range"], 5 * len(dag.nodes))
+        # every search checks at least its start time
+        self.assertGreaterEqual(stats["counters"]["calculation_slots_probed"], 5 * len(dag.nodes))
+        self.assertGreaterEqual(stats["counters"]["transmission_slots_probed"],
+                                stats["counters"]["find_transmission_time_range"])
+        self.assertGreater(stats["counters"]["router_lookups"], 0)
+        self.assertEqual(set(stats["timers"]),
+                         {"queue_generation", "choose_cpu", "schedule_transmits", "schedule_calculation"})
+
+
+class TestTrace(TestCase):
+    def test_spans(self):
+        dag = DAG.generate(5, 20, 10, 0.5, 30, 1, 10, seed=4)
+        tracer = Tracer()
+        system = schedule(dag, ring_system(3), ModellingNeighbourScheduler, tracer=tracer)
+        events = tracer.as_dict()["traceEvents"]
+        self.assertTrue(all(event["ph"] == "X" for event in events))
+
+        names = [event["name"] for event in events]
+        self.assertEqual(names[0], "schedule_dag")
+        for name in ("schedule_task", "choose_cpu", "try_cpu", "schedule_transmits", "schedule_transmission", "route"):
+            self.assertIn(name, names)
+        self.assertEqual(names.count("try_cpu"), 3 * len(dag.nodes))
+
+        # every span is nested in schedule_dag
+        root = events[0]
+        for event in events[1:]:
+            self.assertGreaterEqual(event["ts"], root["ts"])
+            self.assertLessEqual(event["ts"] + event["dur"], root["ts"] + root["dur"] + 1e-3)
+        placed = {event["args"]["task"]: event["args"]["cpu"] for event in events
+                  if event["name"] == "schedule_task" and event["args"]["cpu"]}
+        self.assertEqual(placed, {task.task_name: cpu.cpu_id for cpu in system._cpus.values()
+                                  for task in cpu._alu_tasks})
+
+
+class TestProgress(TestCase):
+    def test_progress(self):
+        dag = DAG.generate(5, 20, 10, 0.5, 30, 1, 10, seed=4)
+        reports = []
+        schedule(dag, ring_system(3), AdvanceNeighbourScheduler, event_driven=True,
+                 progress=lambda done, total: reports.append((done, total)))
+        self.assertEqual(reports, [(done, 10) for done in range(1, 11)])
+
+    def test_cancel(self):
+        dag = DAG.generate(5, 20, 10, 0.5, 30, 1, 10, seed=4)
+        system_graph = ring_system(3)
+        system = System(system_graph, duplex=True, has_io_cpu=True)
+        scheduler = AdvanceNeighbourScheduler(dag, system_graph, QueueGenerationPolicy3(),
+                                              CohesionCPUPrioritizationPolicy(), system, BFSRouter(system_graph),
+                                              event_driven=True,
+                                              progress=lambda done, total: done == 3 and scheduler.cancel())
+        with self.assertRaises(SchedulingCancelled):
+            scheduler.schedule_dag()
+        self.assertEqual(sum(len(cpu._alu_tasks) for cpu in system._cpus.values()), 3)
+
+
+class TestTasksQueueController(TestCase):
+    def test_ready(self):
+        #   a -> c
+        #   b --/
+        dag = DAG()
+        for n_id in "abc":
+            dag.add_node(0, 0, 2, n_id)
+        dag.add_edge("a", "c", 1)
+        dag.add_edge("b", "c", 1)
+        system = System(ring_system(2), duplex=True, has_io_cpu=True)
+        controller = TasksQueueController(dag, ["c", "b", "a"], system)
+
+        self.assertEqual([node.n_id for node in controller.ready(0)], ["b", "a"])
+        b = system.schedule_calculation("b", 0, 2, "0")
+        controller.task_scheduled(dag.nodes["b"], b)
+        self.assertEqual([node.n_id for node in controller.ready(0)], ["a"])
+        a = system.schedule_calculation("a", 1, 2, "1")
+        controller.task_scheduled(dag.nodes["a"], a)
+
+        self.assertEqual(list(controller.ready(2)), [])
+        self.assertEqual([node.n_id for node in controller.ready(3)], ["c"])
+        self.assertFalse(controller.done(3))
@@ -0,0 +1,50 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from contextlib import redirect_stderr
+from io import StringIO
+from staticsched.graph_analytics.sweep import grid, run_sweep, run_cell, ResultsFile, cell_key
+
+SAVED = os.path.join(os.path.dirname(__file__), "..", "..", "..", "saved")
+
+
+class TestSweep(TestCase):
+    def setUp(self):
+        self.cells = list(grid([(os.path.join(SAVED, "3line"), None)], scales=[2], connectivities=[0.3, 0.6],
+                               queues=["3"], schedulers=["advance", "modelling"],
+                               duplex=[True], io_cpu=[True], runs=2))
+
+    def check_resume(self, name):
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, name)
+            self.assertEqual(run_sweep(self.cells[:3], output, workers=2), 3)
+            # interrupted in the middle of a row
+            with open(output, "a") as results:
+                results.write('{"system": ')
+            self.assertEqual(run_sweep(self.cells, output, workers=2), len(self.cells) - 3)
+            self.assertEqual(run_sweep(self.cells, output, workers=2), 0)
+
+            rows = {cell_key(row): row for row in ResultsFile(output).rows()}
+            self.assertEqual(len(rows), len(self.cells))
+            for cell in self.cells[:2]:
+                self.assertEqual(float(rows[cell_key(cell)]["duration"]), run_cell(cell)["duration"])
+
+    def test_jsonl(self):
+        self.check_resume("results.jsonl")
+
+    def test_csv(self):
+        self.check_resume("results.csv")
+
+    def test_failed_cell(self):
+        missing = self.cells[0]._replace(system=os.path.join(SAVED, "missing"))
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.jsonl")
+            with redirect_stderr(StringIO()) as errors:
+                self.assertEqual(run_sweep([missing] + self.cells[:2], output, workers=2), 2)
+            self.assertIn("failed", errors.getvalue())
+            self.assertEqual(ResultsFile(output).completed(), {cell_key(cell) for cell in self.cells[:2]})
+
+    def test_same_dag_for_schedulers(self):
+        advance, modelling = [run_cell(cell) for cell in self.cells if cell.connectivity == 0.3 and cell.run == 0]
+        self.assertEqual(advance["seed"], modelling["seed"])
+        self.assertEqual(advance["duration_on_one_cpu"], modelling["duration_on_one_cpu"])
@@ -0,0 +1,26 @@
+from unittest import TestCase
+from staticsched.graph_analytics.cpu_priorities import CohesionCPUPrioritizationPolicy
+from staticsched.graph_analytics.raw_graph import DAG
+from staticsched.graph_analytics.scheduler.schedulers import ModellingNeighbourScheduler
+from staticsched.graph_analytics.system_template import SystemTemplate
+from staticsched.graph_analytics.task_queues import QueueGenerationPolicy3
+from staticsched.graph_analytics.tests.test_schedulers import ring_system, schedule, placement
+
+
+class TestSystemTemplate(TestCase):
+    def setUp(self):
+        self.system_graph = ring_system(4)
+        self.template = SystemTemplate(self.system_graph, duplex=True, has_io_cpu=True)
+
+    def test_tables(self):
+        self.assertEqual(self.template.router.distance("0", "2"), 2)
+        self.assertEqual(self.template.cpu_priorities_policy.get_priorities(self.system_graph),
+                         CohesionCPUPrioritizationPolicy().get_priorities(self.system_graph))
+
+    def test_fresh_systems(self):
+        dag = DAG.generate(5, 20, 12, 0.5, 30, 1, 10, seed=2)
+        expected = placement(schedule(dag, self.system_graph, ModellingNeighbourScheduler))
+        for _ in range(2):
+            scheduler = self.template.scheduler(ModellingNeighbourScheduler, dag, QueueGenerationPolicy3())
+            scheduler.schedule_dag()
+            self.assertEqual(placement(scheduler._system), expected)
@@ -0,0 +1,42 @@
+import json
+import os
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class Tracer:
+    """
+    Records nested spans in the Chrome trace-event format, the written file opens
+    in chrome://tracing or ui.perfetto.dev
+    """
+    def __init__(self):
+        self.events = []
+        self._origin = perf_counter()
+        self._pid = os.getpid()
+
+    def _timestamp(self, time):
+        # trace-event timestamps are in microseconds
+        return (time - self._origin) * 1e6
+
+    @contextmanager
+    def span(self, name, **args):
+        """
+        Records the enclosed block as one span, yields its args dict to add results to
+        """
+        started = perf_counter()
+        try:
+            yield args
+        finally:
+            finished = perf_counter()
+            self.events.append({"name": name, "ph": "X", "pid": self._pid, "tid": 0,
+                                "ts": self._timestamp(started),
+                                "dur": self._timestamp(finished) - self._timestamp(started),
+                                "args": args})
+
+    def as_dict(self):
+        return {"traceEvents": sorted(self.events, key=lambda event: event["ts"]),
+                "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        with open(path, "w") as trace_file:
+            json.dump(self.as_dict(), trace_file)
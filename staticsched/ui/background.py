@@ -0,0 +1,91 @@
+from itertools import count
+from queue import Queue, Empty
+from threading import Thread
+from weakref import WeakKeyDictionary
+from staticsched.graph_analytics.scheduler.schedulers import SchedulingCancelled
+from staticsched.ui.notification_consts import JOB_PROGRESS, JOB_DONE, JOB_CANCELED, JOB_FAILED
+from staticsched.ui.notifications import notify
+
+_job_ids = count()
+# graph -> (version, copy): an unchanged graph gives the same copy, so its analysis cache is reused
+_snapshots = WeakKeyDictionary()
+
+
+def snapshot(graph):
+    """
+    Copy of a DAG or system graph for a background job, so the canvas can be edited meanwhile.
+    Copies are read-only, one is made per graph version.
+    """
+    version, copy = _snapshots.get(graph, (None, None))
+    if version != graph.version:
+        copy = type(graph)()
+        type(graph).deserialize(copy, graph.serialize())
+        _snapshots[graph] = graph.version, copy
+    return copy
+
+
+class BackgroundJob:
+    """
+    Runs work(report) in a daemon thread. Tk must only be used from the main loop,
+    so report(done, total) calls and the outcome are passed through a queue polled
+    with root.after() and published there on the notifications bus in the job's
+    namespace: JOB_PROGRESS (done, total), then one of JOB_DONE (result),
+    JOB_CANCELED or JOB_FAILED (exception).
+    """
+    POLL_MS = 50
+
+    def __init__(self, root, work, on_cancel=None):
+        self.root = root
+        self.ns = "JOB_{}".format(next(_job_ids))
+        self._work = work
+        self._on_cancel = on_cancel
+        self._messages = Queue()
+        self._cancelled = False
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        """
+        Asks the work to stop (through on_cancel), its result is dropped anyway
+        """
+        self._cancelled = True
+        if self._on_cancel:
+            self._on_cancel()
+
+    def report(self, done, total):
+        """
+        Progress callback of the work, raises SchedulingCancelled once the job is cancelled
+        """
+        if self._cancelled:
+            raise SchedulingCancelled()
+        self._messages.put((JOB_PROGRESS, (done, total)))
+
+    def _run(self):
+        try:
+            self._messages.put((JOB_DONE, self._work(self.report)))
+        except SchedulingCancelled:
+            self._messages.put((JOB_CANCELED, None))
+        except Exception as exception:
+            self._messages.put((JOB_FAILED, exception))
+
+    def _poll(self):
+        progress = None
+        while True:
+            try:
+                bus, msg = self._messages.get_nowait()
+            except Empty:
+                break
+            if bus == JOB_PROGRESS:
+                # only the latest progress of a poll interval is worth drawing
+                progress = msg
+                continue
+            if bus == JOB_DONE and self._cancelled:
+                bus, msg = JOB_CANCELED, None
+            notify(bus, msg, ns=self.ns)
+            return
+        if progress is not None:
+            notify(JOB_PROGRESS, progress, ns=self.ns)
+        self.root.after(self.POLL_MS, self._poll)
@@ -1,8 +1,23 @@
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from functools import partial
+from matplotlib.collections import PolyCollection
 from matplotlib.patches import Rectangle
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MultipleLocator
 
 
+# labels are only drawn on bars at least this wide on screen...
+LABEL_MIN_PIXELS = 40
+# ...and never more than this many at a time (the widest bars win)
+MAX_LABELS = 300
+# per-tick grid is only drawn on short schedules
+TICK_GRID_MAX_TIME = 200
+
+# label() builds the text lazily, most labels of a big schedule are never shown
+GanttBar = namedtuple("GanttBar", ["start", "end", "y", "height", "label_y", "label"])
+
+
 def task_annotation_text(task):
     return "%s-%s>%s\n[%s>%s]" % (task.meta().source,
                                   task.meta().target,
@@ -12,58 +27,99 @@ def task_annotation_text(task):
                                   )
 
 
-def draw_gantt_diagram(system):
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
-
-    max_time = 0
+def gantt_bars(system):
+    """
+    Bars of the diagram by kind: "alu", "ingoing" and "outgoing" (transmissions)
+    """
+    bars = {"alu": [], "ingoing": [], "outgoing": []}
     for i, cpu in enumerate(sorted(system._cpus.values(), key=lambda cpu: cpu.cpu_id)):
-        ranges = []
         for task in cpu._alu_tasks:
-            if task.range[1] > max_time:
-                max_time = task.range[1]
             duration = task.range[1] - task.range[0]
-            ranges.append((task.range[0], duration))
-            plt.annotate("%s [%s]" % (task.task_name, duration), (task.range[0] + 0.1, i + 0.1))
-        ax.broken_barh(ranges, (i, 0.2), alpha=.5, facecolors='lightgray')
+            bars["alu"].append(GanttBar(task.range[0], task.range[1], i, 0.2, i + 0.1,
+                                        partial("{} [{}]".format, task.task_name, duration)))
 
-        link_height = 0.8 / len(cpu._links)
+        link_height = 0.8 / max(len(cpu._links), 1)
         for link in cpu._links:
-            ranges = []
-            for task in link._io_tasks:
-                if task.direction == 0:
-                    continue
-                if task.range[1] > max_time:
-                    max_time = task.range[1]
-                duration = task.range[1] - task.range[0]
-                ranges.append((task.range[0], duration))
-                plt.annotate(task_annotation_text(task),
-                             (task.range[0] + 0.1, i + 0.2 + link_height*link.link_id + 0.05 + link_height/2))
-            ax.broken_barh(ranges, (i + 0.2 + link_height*link.link_id + link_height/2, link_height/2),
-                           alpha=.5, facecolors='yellow', hatch="/")
-
-            ranges = []
+            y = i + 0.2 + link_height*link.link_id
             for task in link._io_tasks:
                 if task.direction == 1:
-                    continue
-                if task.range[1] > max_time:
-                    max_time = task.range[1]
-                duration = task.range[1] - task.range[0]
-                ranges.append((task.range[0], duration))
-                plt.annotate(task_annotation_text(task),
-                             (task.range[0] + 0.1, i + 0.2 + link_height*link.link_id + 0.05))
-            ax.broken_barh(ranges, (i + 0.2 + link_height*link.link_id, link_height/2),
-                           alpha=.5, facecolors='LimeGreen', hatch="\\")
+                    kind, bar_y = "outgoing", y + link_height/2
+                else:
+                    kind, bar_y = "ingoing", y
+                bars[kind].append(GanttBar(task.range[0], task.range[1], bar_y, link_height/2, bar_y + 0.05,
+                                           partial(task_annotation_text, task)))
+    return bars
+
+
+def bars_collection(bars, **options):
+    """
+    All bars of one kind as a single artist
+    """
+    verts = [[(bar.start, bar.y), (bar.start, bar.y + bar.height),
+              (bar.end, bar.y + bar.height), (bar.end, bar.y)] for bar in bars]
+    return PolyCollection(verts, **options)
+
+
+class GanttLabels:
+    """
+    Keeps labels on the bars that are wide enough on screen in the current view,
+    they are recomputed whenever the view is zoomed, panned or resized
+    """
+    def __init__(self, ax, bars):
+        self.ax = ax
+        self.bars = sorted(bars, key=lambda bar: bar.start)
+        self.starts = [bar.start for bar in self.bars]
+        self.longest = max((bar.end - bar.start for bar in self.bars), default=0)
+        self.texts = []
+
+    def visible_bars(self):
+        x_min, x_max = self.ax.get_xlim()
+        width_pixels = self.ax.get_window_extent().width or 1
+        min_duration = LABEL_MIN_PIXELS * (x_max - x_min) / width_pixels
+
+        first = bisect_left(self.starts, x_min - self.longest)
+        last = bisect_right(self.starts, x_max)
+        bars = [bar for bar in self.bars[first:last]
+                if bar.end > x_min and bar.end - bar.start >= min_duration]
+        if len(bars) > MAX_LABELS:
+            bars = sorted(bars, key=lambda bar: bar.end - bar.start, reverse=True)[:MAX_LABELS]
+        return bars
+
+    def update(self):
+        for text in self.texts:
+            text.remove()
+        self.texts = [self.ax.annotate(bar.label(), (bar.start + 0.1, bar.label_y))
+                      for bar in self.visible_bars()]
+        self.ax.figure.canvas.draw_idle()
+
+
+def draw_gantt_diagram(system):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+
+    bars = gantt_bars(system)
+    ax.add_collection(bars_collection(bars["alu"], alpha=.5, facecolors='lightgray'))
+    ax.add_collection(bars_collection(bars["outgoing"], alpha=.5, facecolors='yellow', hatch="/"))
+    ax.add_collection(bars_collection(bars["ingoing"], alpha=.5, facecolors='LimeGreen', hatch="\\"))
+    max_time = max((bar.end for kind_bars in bars.values() for bar in kind_bars), default=0)
 
     ax.set_ylim(0, len(system._cpus))
     ax.set_yticks(list(range(len(system._cpus))))
 
-    ax.set_xlim(0, max_time*1.1)
+    ax.set_xlim(0, max(max_time*1.1, 1))
     ax.set_xlabel('tacts since start')
-    ax.xaxis.set_minor_locator(MultipleLocator(1))
-    ax.xaxis.set_major_locator(MultipleLocator(5))
+    if max_time <= TICK_GRID_MAX_TIME:
+        ax.xaxis.set_minor_locator(MultipleLocator(1))
+        ax.xaxis.set_major_locator(MultipleLocator(5))
 
     ax.grid(True, which="both")
+
+    labels = GanttLabels(ax, bars["alu"] + bars["outgoing"] + bars["ingoing"])
+    # plain functions are kept alive by the callback registries, bound methods are not
+    ax.callbacks.connect("xlim_changed", lambda ax: labels.update())
+    fig.canvas.mpl_connect("resize_event", lambda event: labels.update())
+    labels.update()
+
     mng = plt.get_current_fig_manager()
     # mng.window.showMaximized()
     plt.legend([Rectangle((0, 0), 1, 1, fc="lightgray"),
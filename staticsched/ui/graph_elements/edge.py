@@ -71,12 +71,18 @@ class EdgeDrawController:
         self.canvas.coords(self._weight, *self.mid_coords())
         self.canvas.itemconfig(self._weight, text=str(self.edge.weight) if self.edge.weight >= 0 else "")
 
-    def delete(self):
+    def undraw(self):
+        """
+        Removes the edge from the canvas, it stays in the graph
+        """
         self.canvas.delete(self._line)
         self.canvas.delete(self._weight)
-        notify(EDGE_DELETED, self.edge, ns=self.ns)
         unsubscribe_all(self, ns=self.ns)
 
+    def delete(self):
+        self.undraw()
+        notify(EDGE_DELETED, self.edge, ns=self.ns)
+
     def select(self):
         self.canvas.itemconfig(self._line, fill="blue")
 
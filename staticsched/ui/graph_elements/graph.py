@@ -2,38 +2,63 @@ from staticsched.ui.graph_elements.edge import GraphEdgeDrawController, DAGEdgeD
 from staticsched.ui.graph_elements.node import DAGNodeDrawController, GraphNodeDrawController
 
 from staticsched.ui.notification_consts import *
-from staticsched.ui.notifications import notify, subscribe
+from staticsched.ui.notifications import notify, subscribe, batch
 
 from staticsched.graph_analytics.raw_graph import DAG, Graph, Node, Edge
 
 FAKE_NODE_ID = "fake_node_id"
 
+# only elements within this distance of the visible part of the canvas get controllers
+VIEWPORT_MARGIN = 200
+# with more nodes than this in view the graph is drawn as a plain overview, without controllers
+OVERVIEW_NODES = 300
+# ...and its edges are left out above this many
+OVERVIEW_EDGES = 3000
+# cell size of the spatial index of nodes
+BIN_SIZE = 200
+
 
 class GraphDrawController:
+    """
+    Draws the part of the graph around the viewport (set_viewport): node and edge
+    controllers are created when their elements scroll into view and dropped when
+    they leave it. Too many nodes in view are drawn as a plain overview instead,
+    unless `details` is set: the overview can not be edited.
+    """
     def __init__(self, canvas, graph):
         self.graph = graph
         self.ns = graph.graph_id
         self.canvas = canvas
         self.selected = None
+        # controllers of the drawn nodes and edges only
         self.nodes = {}
-        self.edges = []
+        self.edges = {}
         self.connecting_started_with = None
         self._fake_edge = None
         self._fake_node = Node(FAKE_NODE_ID, 0, 0, -1)
         self.graph_id = graph.graph_id
+        self.viewport = (0, 0, int(canvas["width"]), int(canvas["height"]))
+        # spatial index of all nodes: (column, row) -> node ids
+        self._bins = {}
+        self._node_bins = {}
+        self._marks = {}
+        self._refresh_pending = False
+        self.details = False
         subscribe(CONNECT_START, self.on_connect_start, ns=self.ns)
         subscribe(CONNECT_END, self.on_connect_end, ns=self.ns)
         subscribe(CONNECT_CANCELED, self.on_connect_cancel, ns=self.ns)
         subscribe(FAKE_NODE_DRAG_EVENT, self.fake_node_drag, ns=self.ns)
         subscribe(NODE_DELETED, self.node_deleted, ns=self.ns)
         subscribe(EDGE_DELETED, self.edge_deleted, ns=self.ns)
+        # dragging and loading move many nodes, their edges are redrawn once per idle cycle
+        batch(self.ns, canvas.after_idle)
         if self.graph.is_directed():
             self.EdgeDrawController = DAGEdgeDrawController
         else:
             self.EdgeDrawController = GraphEdgeDrawController
 
     def on_connect_start(self, node_id):
-        node = self.nodes[node_id].node
+        node = self.graph.nodes[node_id]
 
         self.connecting_started_with = node_id
 
@@ -59,11 +84,11 @@ class GraphDrawController:
         self._fake_node.x, self._fake_node.y = coords
         notify(NODE_CHANGED.format(FAKE_NODE_ID), None, ns=self.ns)
 
-    def create_node_controller(self, node):
+    def create_node_controller(self, node, animate=True):
         if isinstance(self.graph, Graph):
-            return GraphNodeDrawController(self.canvas, node, ns=self.ns)
+            return GraphNodeDrawController(self.canvas, node, ns=self.ns, animate=animate)
         elif isinstance(self.graph, DAG):
-            return DAGNodeDrawController(self.canvas, node, ns=self.ns)
+            return DAGNodeDrawController(self.canvas, node, ns=self.ns, animate=animate)
         else:
             raise NotImplemented()
 
@@ -75,14 +100,125 @@ class GraphDrawController:
         else:
             raise NotImplemented()
 
+    def node_controller(self, n_id, animate=False):
+        if n_id not in self.nodes:
+            self.nodes[n_id] = self.create_node_controller(self.graph.nodes[n_id], animate=animate)
+            if n_id in self._marks:
+                self.nodes[n_id].mark(self._marks[n_id])
+        return self.nodes[n_id]
+
+    def edge_controller(self, edge):
+        if edge not in self.edges:
+            self.edges[edge] = self.create_edge_controller(edge)
+        return self.edges[edge]
+
     def add_node(self, x, y, weight=1, n_id=None):
         node = self.graph.add_node(x=x, y=y, weight=weight, n_id=n_id)
-        self.nodes[node.n_id] = self.create_node_controller(node)
+        self._index(node)
+        self.schedule_refresh()
         return node
 
+    def _index(self, node):
+        node_bin = (int(node.x // BIN_SIZE), int(node.y // BIN_SIZE))
+        old_bin = self._node_bins.get(node.n_id)
+        if old_bin == node_bin:
+            return
+        if old_bin is not None:
+            self._unindex(node.n_id)
+        self._bins.setdefault(node_bin, set()).add(node.n_id)
+        self._node_bins[node.n_id] = node_bin
+
+    def _unindex(self, n_id):
+        node_bin = self._node_bins.pop(n_id, None)
+        if node_bin is not None:
+            self._bins[node_bin].discard(n_id)
+            if not self._bins[node_bin]:
+                del self._bins[node_bin]
+
+    def nodes_in(self, x0, y0, x1, y1):
+        """
+        Ids of the nodes inside the rectangle
+        """
+        found = set()
+        for column in range(int(x0 // BIN_SIZE), int(x1 // BIN_SIZE) + 1):
+            for row in range(int(y0 // BIN_SIZE), int(y1 // BIN_SIZE) + 1):
+                for n_id in self._bins.get((column, row), ()):
+                    node = self.graph.nodes[n_id]
+                    if x0 <= node.x <= x1 and y0 <= node.y <= y1:
+                        found.add(n_id)
+        return found
+
+    def bounds(self):
+        columns = [column for column, _ in self._bins] + [0]
+        rows = [row for _, row in self._bins] + [0]
+        return (min(columns) * BIN_SIZE, min(rows) * BIN_SIZE,
+                (max(columns) + 1) * BIN_SIZE, (max(rows) + 1) * BIN_SIZE)
+
+    def set_viewport(self, x0, y0, x1, y1):
+        self.viewport = (x0, y0, x1, y1)
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.canvas.after_idle(self.refresh)
+
+    def refresh(self):
+        self._refresh_pending = False
+        # only drawn nodes can be dragged
+        for controller in self.nodes.values():
+            self._index(controller.node)
+        self.canvas.configure(scrollregion=self.bounds())
+
+        x0, y0, x1, y1 = self.viewport
+        visible = self.nodes_in(x0 - VIEWPORT_MARGIN, y0 - VIEWPORT_MARGIN,
+                                x1 + VIEWPORT_MARGIN, y1 + VIEWPORT_MARGIN)
+        visible_edges = {edge for n_id in visible
+                         for edge in self.graph.edges_from_node(self.graph.nodes[n_id]) +
+                         self.graph.edges_to_node(self.graph.nodes[n_id])}
+        self.canvas.delete("overview")
+        if not self.details and len(visible) > OVERVIEW_NODES:
+            self.draw_overview(visible, visible_edges)
+        else:
+            self.draw_details(visible, visible_edges)
+
+    def set_details(self, details):
+        self.details = details
+        self.schedule_refresh()
+
+    def draw_details(self, visible, visible_edges):
+        for n_id in [n_id for n_id in self.nodes if n_id not in visible]:
+            self.hide(self.nodes.pop(n_id))
+        for edge in [edge for edge in self.edges if edge not in visible_edges]:
+            self.hide(self.edges.pop(edge))
+        for edge in visible_edges:
+            self.edge_controller(edge)
+        for n_id in visible:
+            self.node_controller(n_id)
+        # nodes are drawn over the edges
+        self.canvas.tag_raise("node")
+
+    def draw_overview(self, visible, visible_edges):
+        for controller in list(self.nodes.values()) + list(self.edges.values()):
+            self.hide(controller)
+        self.nodes, self.edges = {}, {}
+        if len(visible_edges) <= OVERVIEW_EDGES:
+            for edge in visible_edges:
+                self.canvas.create_line(edge.source.x, edge.source.y, edge.target.x, edge.target.y,
+                                        fill="gray", tags=("overview",))
+        for n_id in visible:
+            node = self.graph.nodes[n_id]
+            self.canvas.create_oval(node.x - 3, node.y - 3, node.x + 3, node.y + 3,
+                                    fill=self._marks.get(n_id, "black"), outline="", tags=("overview",))
+
+    def hide(self, controller):
+        if controller is self.selected:
+            self.selected = None
+        controller.undraw()
+
     def select_node(self, n_id):
         self.deselect()
-        self.nodes[n_id].select()
+        self.node_controller(n_id).select()
         self.selected = self.nodes[n_id]
 
     def select_edge(self, selected_edge):
@@ -92,38 +228,52 @@ class GraphDrawController:
         self.selected = edge
 
     def find_edge(self, selected_edge):
-        for edge in self.edges:
-            if edge.edge.source.n_id == selected_edge[0] and \
-                            edge.edge.target.n_id == selected_edge[1]:
-                return edge
+        source = self.graph.nodes[selected_edge[0]]
+        for edge in self.graph.edges_from_node(source):
+            if edge.target.n_id == selected_edge[1]:
+                return self.edge_controller(edge)
 
     def deselect(self):
         if self.selected:
             self.selected.deselect()
 
     def add_edge(self, source, target, weight):
-        edge = self.graph.add_edge(source, target, weight)
-        self.edges.append(self.create_edge_controller(edge))
+        self.graph.add_edge(source, target, weight)
+        self.schedule_refresh()
 
     def delete_current(self):
         if self.selected:
             self.selected.delete()
+            self.selected = None
 
     def delete_all(self):
-        for node in self.nodes.values():
-            node.delete()
+        for controller in list(self.nodes.values()) + list(self.edges.values()):
+            self.hide(controller)
+        self.nodes, self.edges = {}, {}
+        self.canvas.delete("overview")
+        for n_id in list(self.graph.nodes):
+            self.node_deleted(n_id)
 
     def node_deleted(self, node_id):
         self.graph.delete_node(node_id)
+        self.nodes.pop(node_id, None)
+        self._marks.pop(node_id, None)
+        self._unindex(node_id)
 
     def edge_deleted(self, edge):
         self.graph.delete_edge(edge)
+        self.edges.pop(edge, None)
 
     def reset_marks(self):
+        self._marks = {}
         for node in self.nodes.values():
             node.reset_mark()
+        self.schedule_refresh()
 
     def mark_nodes(self, node_list, color):
         for node_id in node_list:
-            if node_id in self.nodes:
-                self.nodes[node_id].mark(color)
+            if node_id in self.graph.nodes:
+                self._marks[node_id] = color
+                if node_id in self.nodes:
+                    self.nodes[node_id].mark(color)
+        self.schedule_refresh()
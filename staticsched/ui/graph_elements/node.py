@@ -9,7 +9,7 @@ ANIMATION_TIME = 25
 
 
 class NodeDrawController:
-    def __init__(self, canvas, node, ns):
+    def __init__(self, canvas, node, ns, animate=True):
         self.ns = ns
         self.node = node
         self.canvas = canvas
@@ -17,7 +17,8 @@ class NodeDrawController:
         self._separator = None
         self._identifier = None
         self._weight = None
-        self.x_rad = NODE_RADIUS / 4
+        self.x_rad = NODE_RADIUS / 4 if animate else NODE_RADIUS
+        self._undrawn = False
         self.create_shape()
         self.connecting_started_with = None
         subscribe(NODE_CHANGED.format(self.node.n_id), self.node_changed, ns=self.ns)
@@ -36,24 +37,29 @@ class NodeDrawController:
         notify(NODE_WEIGHT_REQUEST, self.node, ns=self.ns)
 
     def arrow_drag(self, event):
-        notify(FAKE_NODE_DRAG_EVENT, (event.x, event.y), ns=self.ns)
+        notify(FAKE_NODE_DRAG_EVENT, (self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)), ns=self.ns)
+
+    def undraw(self):
+        """
+        Removes the node from the canvas, it stays in the graph
+        """
+        self._undrawn = True
+        self.canvas.delete(self.get_tag())
+        unsubscribe_all(self, ns=self.ns)
 
     def delete(self):
-        self.canvas.delete(self._identifier)
-        self.canvas.delete(self._separator)
-        self.canvas.delete(self._weight)
-        self.canvas.delete(self._shape)
+        self.undraw()
         notify(DELETE_NODE.format(self.node.n_id), self.node.n_id, ns=self.ns)
         notify(NODE_DELETED, self.node.n_id, ns=self.ns)
-        unsubscribe_all(self, ns=self.ns)
 
     def node_move(self, event):
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
         items = self.canvas.find_withtag(self.get_tag())
         for i in items:
-            self.canvas.move(i, (event.x - self.node.x),
-                                (event.y - self.node.y))
-        self.node.x = event.x
-        self.node.y = event.y
+            self.canvas.move(i, (x - self.node.x),
+                                (y - self.node.y))
+        self.node.x = x
+        self.node.y = y
         notify(NODE_CHANGED.format(self.node.n_id), None, ns=self.ns)
 
     def start_connecting(self, event):
@@ -69,6 +75,8 @@ class NodeDrawController:
         self.canvas.tag_bind(self.get_weight_tag(), "<ButtonPress-1>", self.on_weight_click)
 
     def animate_showing(self):
+        if self._undrawn:
+            return
         if self.x_rad >= NODE_RADIUS:
             self.draw_info()
 
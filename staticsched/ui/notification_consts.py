@@ -11,3 +11,8 @@ FAKE_NODE_DRAG_EVENT = "FAKE_NODE_DRAG_EVENT"
 DELETE_NODE = "DELETE_NODE_{}"
 NODE_DELETED = "NODE_DELETED"
 EDGE_DELETED = "EDGE_DELETED"
+
+JOB_PROGRESS = "JOB_PROGRESS"
+JOB_DONE = "JOB_DONE"
+JOB_CANCELED = "JOB_CANCELED"
+JOB_FAILED = "JOB_FAILED"
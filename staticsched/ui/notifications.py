@@ -1,45 +1,126 @@
+from functools import partial
+from inspect import ismethod, signature, Parameter
 from weakref import WeakMethod
-from inspect import ismethod
+from staticsched.ui.notification_consts import NODE_CHANGED, EDGE_CHANGED
 
+# ns -> bus -> handler key -> (handler ref, takes_ns)
 BUS_LIST = {}
+# (ns, id(owner)) -> {(bus, handler key)} of the bound methods of `owner`, for unsubscribe_all
+OWNERS = {}
 
+# topics where only the last message matters, batched namespaces dispatch them once per idle cycle
+COALESCED = (NODE_CHANGED.split("{")[0], EDGE_CHANGED.split("{")[0])
+# ns -> after_idle of a Tk widget
+BATCHED = {}
+# ns -> bus -> last message
+PENDING = {}
 
-def bus_name(ns, bus):
-    return "{}::{}".format(ns, bus)
 
+def _handler_key(handler):
+    if ismethod(handler):
+        return id(handler.__self__), handler.__func__
+    return None, handler
 
-def notify(bus, msg, ns="DEFAULT"):
-    handlers = BUS_LIST.get(bus_name(ns, bus), [])
-    handlers += BUS_LIST.get(bus_name("ALL", bus), [])
-    for handler in handlers:
-        handler_func = handler()
-        if handler_func:
-            try:
-                handler_func(msg)
-            except TypeError:
+
+def _takes_ns(handler):
+    """
+    Handlers take (msg) or (msg, ns), decided once on subscribe
+    """
+    try:
+        parameters = signature(handler).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    positional = [parameter for parameter in parameters
+                  if parameter.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)]
+    return len(positional) > 1 or any(parameter.kind == Parameter.VAR_POSITIONAL for parameter in parameters)
+
+
+def _forget(ns, bus, key, ref=None):
+    handlers = BUS_LIST.get(ns, {}).get(bus)
+    if handlers is None or key not in handlers:
+        return
+    if ref is not None and handlers[key][0] is not ref:
+        return
+    del handlers[key]
+    if not handlers:
+        del BUS_LIST[ns][bus]
+        if not BUS_LIST[ns]:
+            del BUS_LIST[ns]
+    owner_id = key[0]
+    if owner_id is not None:
+        owned = OWNERS.get((ns, owner_id))
+        if owned is not None:
+            owned.discard((bus, key))
+            if not owned:
+                del OWNERS[(ns, owner_id)]
+
+
+def _dispatch(bus, msg, ns):
+    namespaces = [ns] if ns == "ALL" else [ns, "ALL"]
+    for handlers_ns in namespaces:
+        handlers = BUS_LIST.get(handlers_ns, {}).get(bus)
+        if not handlers:
+            continue
+        # handlers may (un)subscribe while being notified
+        for key, (ref, takes_ns) in list(handlers.items()):
+            if handlers.get(key, (None,))[0] is not ref:
+                continue
+            handler_func = ref()
+            if handler_func is None:
+                continue
+            if takes_ns:
                 handler_func(msg, ns)
+            else:
+                handler_func(msg)
+
+
+def notify(bus, msg, ns="DEFAULT"):
+    after_idle = BATCHED.get(ns)
+    if after_idle is not None and bus.startswith(COALESCED):
+        pending = PENDING.get(ns)
+        if pending is None:
+            pending = PENDING[ns] = {}
+            after_idle(partial(flush, ns))
+        pending[bus] = msg
+        return
+    _dispatch(bus, msg, ns)
 
 
 def subscribe(bus, handler, ns="DEFAULT"):
-    handlers = BUS_LIST.get(bus_name(ns, bus), [])
+    key = _handler_key(handler)
+    handlers = BUS_LIST.setdefault(ns, {}).setdefault(bus, {})
     if ismethod(handler):
-        handlers.append(WeakMethod(handler))
+        # the bus does not keep its subscribers alive, dead ones are dropped by the callback
+        ref = WeakMethod(handler, partial(_forget, ns, bus, key))
+        OWNERS.setdefault((ns, key[0]), set()).add((bus, key))
     else:
-        handlers.append(lambda: handler)
-    BUS_LIST[bus_name(ns, bus)] = handlers
+        ref = lambda: handler
+    handlers[key] = (ref, _takes_ns(handler))
 
 
 def unsubscribe(bus, handler, ns="DEFAULT"):
-    handlers = BUS_LIST.get(bus_name(ns, bus), [])
-    if handler in handlers:
-        handlers.remove(handler)
+    _forget(ns, bus, _handler_key(handler))
 
 
 def unsubscribe_all(obj, ns="DEFAULT"):
-    for bus in BUS_LIST:
-        for handler in BUS_LIST[bus]:
-            try:
-                if handler.__self__ == obj:
-                    unsubscribe(bus.replace(ns+"::", ""), handler, ns=ns)
-            except AttributeError:
-                pass
+    for bus, key in list(OWNERS.get((ns, id(obj)), ())):
+        _forget(ns, bus, key)
+
+
+def batch(ns, after_idle):
+    """
+    Coalesces NODE_CHANGED and EDGE_CHANGED notifications of `ns`: the last message
+    of every topic is dispatched once, when Tk gets idle (after_idle of any widget)
+    """
+    BATCHED[ns] = after_idle
+
+
+def unbatch(ns):
+    flush(ns)
+    BATCHED.pop(ns, None)
+
+
+def flush(ns):
+    pending = PENDING.pop(ns, None)
+    for bus, msg in (pending or {}).items():
+        _dispatch(bus, msg, ns)
@@ -1,13 +1,36 @@
+from numbers import Number
+from operator import itemgetter
 from tkinter import *
 from tkinter.ttk import *
 
 
+ROW_HEIGHT = 20
+
+
+def sort_key(value):
+    # numbers before everything else, which is compared as text
+    if isinstance(value, Number):
+        return 0, value, ""
+    return 1, 0, str(value)
+
+
 class TableWindow:
-    def __init__(self, root, headers, data, title=""):
+    """
+    Virtual table: the Treeview holds only the rows that fit in the window, their
+    values are taken from `data` as it scrolls. `columns` are functions item -> value,
+    one per header (by default items are rows), called only for the shown rows and,
+    when sorting, for the sorted column.
+    """
+    def __init__(self, root, headers, data, title="", columns=None):
         self.root = Toplevel(root)
         self.root.wm_title(title)
         self.headers = headers
         self.data = data
+        self.columns = columns or [itemgetter(i) for i in range(len(headers))]
+        # data indices in display order
+        self.order = range(len(data))
+        self.sorted_by = None
+        self.first = 0
         self.build()
 
     def build(self):
@@ -15,18 +38,65 @@ class TableWindow:
         self.frame.pack(fill='both', expand=True)
 
         self.tree = Treeview(self.root, columns=self.headers, show="headings")
-        vsb = Scrollbar(self.root, orient="vertical", command=self.tree.yview)
+        self.vsb = Scrollbar(self.root, orient="vertical", command=self.scroll)
         hsb = Scrollbar(self.root, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.tree.configure(xscrollcommand=hsb.set)
         self.tree.grid(column=0, row=0, sticky='nsew', in_=self.frame)
-        vsb.grid(column=1, row=0, sticky='ns', in_=self.frame)
+        self.vsb.grid(column=1, row=0, sticky='ns', in_=self.frame)
         hsb.grid(column=0, row=1, sticky='ew', in_=self.frame)
         self.frame.grid_columnconfigure(0, weight=1)
         self.frame.grid_rowconfigure(0, weight=1)
 
-        for column in self.headers:
-            self.tree.heading(column, text=column.title())
-            self.tree.heading(column, text=column.title())
+        for i, column in enumerate(self.headers):
+            self.tree.heading(column, text=column.title(), command=lambda i=i: self.sort(i))
+
+        self.tree.bind("<Configure>", self.resize)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll("scroll", -1 if event.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda event: self.scroll("scroll", -1, "units"))
+        self.tree.bind("<Button-5>", lambda event: self.scroll("scroll", 1, "units"))
+        self.resize()
+
+    def page_size(self):
+        height = self.tree.winfo_height()
+        if height <= 1:  # not mapped yet
+            return int(self.tree["height"])
+        items = self.tree.get_children()
+        bbox = self.tree.bbox(items[0]) if items else None
+        if bbox:
+            heading_height, row_height = bbox[1], bbox[3]
+        else:
+            heading_height, row_height = ROW_HEIGHT, ROW_HEIGHT
+        return max(1, (height - heading_height) // row_height)
+
+    def resize(self, event=None):
+        items = self.tree.get_children()
+        page = min(self.page_size(), len(self.data))
+        if len(items) < page:
+            for _ in range(page - len(items)):
+                self.tree.insert('', 'end')
+        elif len(items) > page:
+            self.tree.delete(*items[page:])
+        self.show(self.first)
+
+    def show(self, first):
+        items = self.tree.get_children()
+        self.first = max(0, min(first, len(self.data) - len(items)))
+        for item, i in zip(items, self.order[self.first:self.first + len(items)]):
+            self.tree.item(item, values=[column(self.data[i]) for column in self.columns])
+        if self.data:
+            self.vsb.set(self.first / len(self.data), (self.first + len(items)) / len(self.data))
+
+    def scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.show(int(float(amount) * len(self.data)))
+        elif unit == "pages":
+            self.show(self.first + int(amount) * len(self.tree.get_children()))
+        else:
+            self.show(self.first + int(amount))
 
-        for row in self.data:
-            self.tree.insert('', 'end', values=row)
+    def sort(self, column):
+        reverse = self.sorted_by == (column, False)
+        values = [sort_key(self.columns[column](item)) for item in self.data]
+        self.order = sorted(range(len(self.data)), key=values.__getitem__, reverse=reverse)
+        self.sorted_by = (column, reverse)
+        self.show(0)
@@ -1,10 +1,11 @@
+import re
 from tkinter import *
 from tkinter.ttk import *
 
 from staticsched.graph_analytics.raw_graph import Graph
 from staticsched.ui.notification_consts import *
 from staticsched.ui.graph_elements.graph import GraphDrawController
-from staticsched.ui.notifications import notify, unsubscribe_all
+from staticsched.ui.notifications import notify, unsubscribe_all, unbatch
 
 
 class GraphCanvas(Canvas):
@@ -20,8 +21,38 @@ class GraphCanvas(Canvas):
         self.bind("<Double-Button-1>", self.add_node)
         self.bind("<Button-1>", self.select)
         self.bind("<ButtonRelease-3>", self.end_connecting)
+        self.bind("<Configure>", self.viewport_changed)
+        self.bind("<MouseWheel>", self.wheel)
+        self.bind("<Button-4>", self.wheel)
+        self.bind("<Button-5>", self.wheel)
         self.pack(in_=self.root, expand=YES, fill=BOTH)
 
+    def attach_scrollbars(self, x_scrollbar, y_scrollbar):
+        x_scrollbar.configure(command=self.scroll_x)
+        y_scrollbar.configure(command=self.scroll_y)
+        self.configure(xscrollcommand=x_scrollbar.set, yscrollcommand=y_scrollbar.set)
+
+    def scroll_x(self, *args):
+        self.xview(*args)
+        self.viewport_changed()
+
+    def scroll_y(self, *args):
+        self.yview(*args)
+        self.viewport_changed()
+
+    def wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_y("scroll", -1, "units")
+        else:
+            self.scroll_y("scroll", 1, "units")
+
+    def viewport_changed(self, event=None):
+        width, height = self.winfo_width(), self.winfo_height()
+        if width <= 1:  # not mapped yet
+            width, height = int(self["width"]), int(self["height"])
+        x, y = self.canvasx(0), self.canvasy(0)
+        self.graph.set_viewport(x, y, x + width, y + height)
+
     def delete_pressed(self, event):
         self.graph.delete_current()
 
@@ -33,7 +64,8 @@ class GraphCanvas(Canvas):
             notify(CONNECT_CANCELED, None, ns=self.ns)
 
     def add_node(self, event):
-        node = self.graph.add_node(event.x, event.y)
+        node = self.graph.add_node(self.canvasx(event.x), self.canvasy(event.y))
+        self.graph.node_controller(node.n_id, animate=True)
         self.graph.select_node(node.n_id)
 
     def is_selected(self, object_id):
@@ -52,7 +84,7 @@ class GraphCanvas(Canvas):
         return filter(None, re.findall(r"line[^_]*_[^_]*", tags[0]))
 
     def find_node_by_coords(self, x, y):
-        q = self.find_closest(x, y)
+        q = self.find_closest(self.canvasx(x), self.canvasy(y))
         tags = self.gettags(q)
         if self.is_selected(q) and self.is_node_selected(q):
             selected_node = list(self.find_item_in_tag(tags))[0].replace("item_", "")
@@ -60,7 +92,7 @@ class GraphCanvas(Canvas):
         return None
 
     def find_edge_by_coords(self, x, y):
-        q = self.find_closest(x, y)
+        q = self.find_closest(self.canvasx(x), self.canvasy(y))
         tags = self.gettags(q)
         if self.is_selected(q) and self.is_edge_selected(q):
             selected_edge = list(self.find_edge_in_tag(tags))[0].replace("line", "").split("_")
@@ -80,16 +112,23 @@ class GraphCanvas(Canvas):
     def cleanup(self):
         self.graph.delete_all()
         unsubscribe_all(self.graph, ns=self.ns)
+        unbatch(self.ns)
 
     def load_new_graph(self, task_dag, serialized):
+        details = self.graph.details
         self.cleanup()
         self.graph = GraphDrawController(self, task_dag)
+        self.graph.set_details(details)
         self.ns = self.graph.graph_id
+        self.viewport_changed()
         Graph.deserialize(self.graph, serialized)
 
     def reset_marks(self):
         self.graph.reset_marks()
 
+    def toggle_details(self):
+        self.graph.set_details(not self.graph.details)
+
     def mark_nodes(self, node_list, color):
         self.graph.mark_nodes(node_list, color)
 
@@ -97,7 +136,12 @@ class GraphCanvas(Canvas):
 class CanvasFrame(Frame):
     def __init__(self, graph, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.x_scrollbar = Scrollbar(self, orient=HORIZONTAL)
+        self.x_scrollbar.pack(side=BOTTOM, fill=X)
+        self.y_scrollbar = Scrollbar(self, orient=VERTICAL)
+        self.y_scrollbar.pack(side=RIGHT, fill=Y)
         self.canvas = GraphCanvas(self, graph)
+        self.canvas.attach_scrollbars(self.x_scrollbar, self.y_scrollbar)
 
     def load_new_graph(self, graph, serialized):
         self.canvas.load_new_graph(graph, serialized)
@@ -111,5 +155,8 @@ class CanvasFrame(Frame):
     def reset_marks(self):
         self.canvas.reset_marks()
 
+    def toggle_details(self):
+        self.canvas.toggle_details()
+
     def mark_nodes(self, node_list, color="red"):
         self.canvas.mark_nodes(node_list, color=color)
@@ -11,7 +11,9 @@ from staticsched.graph_analytics.analyse import find_all_cycles, is_connected, f
 from staticsched.graph_analytics.task_queues import QueueGenerationPolicy2, QueueGenerationPolicy3, \
     QueueGenerationPolicy12, QueueGenerationPolicy4, QueueGenerationPolicy16
 from staticsched.graph_analytics.raw_graph import DAG, Graph
+from staticsched.ui.background import snapshot
 from staticsched.ui.table_window import TableWindow
+from staticsched.ui.windows.progress_window import run_in_background
 from staticsched.ui.windows.schedule_params_window import SchedulerParamsWindow
 
 
@@ -85,6 +87,7 @@ class UI:
         dag_menu.add_separator()
         dag_menu.add_command(label="Check", command=self.dag_check)
         dag_menu.add_command(label="Reset marks", command=self.dag_reset_marks)
+        dag_menu.add_command(label="Toggle details", command=self.dag_frame.toggle_details)
         dag_menu.add_command(label="Find critical path", command=self.find_critical_path)
         dag_menu.add_command(label="Generate queue (method #2)", command=self.queue_2)
         dag_menu.add_command(label="Generate queue (method #3)", command=self.queue_3)
@@ -97,6 +100,7 @@ class UI:
         graph_menu.add_command(label="Enumerate", command=self.system_graph_re_enumerate)
         graph_menu.add_command(label="Check", command=self.system_check)
         graph_menu.add_command(label="Reset marks", command=self.system_reset_marks)
+        graph_menu.add_command(label="Toggle details", command=self.system_frame.toggle_details)
 
         schedule_menu = Menu(self.menu)
         self.menu.add_cascade(label="Scheduler", menu=schedule_menu)
@@ -130,30 +134,44 @@ class UI:
         self.system_frame.reset_marks()
 
     def find_critical_path(self):
-        length, path = find_critical_path(self.task_dag)
+        task_dag = snapshot(self.task_dag)
+        run_in_background(self.root, "Critical path", lambda report: find_critical_path(task_dag),
+                          self.show_critical_path)
+
+    def show_critical_path(self, critical_path):
+        length, path = critical_path
         self.dag_frame.mark_nodes(path, color="green")
-        TableWindow(self.root, ["node"], [[node] for node in path], "Critical path")
+        TableWindow(self.root, ["node"], path, "Critical path", columns=[str])
 
     def queue_2(self):
-        paths_down = find_all_critical_paths(self.task_dag, forward=True, weight_based=True)
-        paths_up = find_all_critical_paths(self.task_dag, forward=False, weight_based=True)
-        max_critical_path = max(paths_down.items(), key=lambda item: (item[1][0], item[0]))
-        queue = QueueGenerationPolicy2().get_queue(self.task_dag)
+        task_dag = snapshot(self.task_dag)
+
+        def work(report):
+            paths_down = find_all_critical_paths(task_dag, forward=True, weight_based=True)
+            paths_up = find_all_critical_paths(task_dag, forward=False, weight_based=True)
+            queue = QueueGenerationPolicy2().get_queue(task_dag)
+            return queue, paths_down, paths_up
+
+        run_in_background(self.root, "Queue #2", work, self.show_queue_2)
+
+    def show_queue_2(self, result):
+        queue, paths_down, paths_up = result
         print(queue)
+        # paths are rebuilt only for the rows on screen
+        max_node = max(paths_down, key=lambda node: (paths_down.length(node), node), default=None)
+        max_length, max_path = paths_down[max_node] if max_node is not None else (0, [])
         TableWindow(self.root, ["node", "Tcrit<down>", "Tcrit<up>", "Tcrit<max>",
                                 "Critical path DOWN", "Critical path UP", "Critical path MAX"],
-                    [[node, paths_down[node][0], paths_up[node][0], max_critical_path[1][0],
-                      paths_down[node][1], paths_up[node][1], max_critical_path[1][1]]
-                     for node in queue],
-                    "Queue #2")
+                    queue, "Queue #2",
+                    columns=[str, paths_down.length, paths_up.length, lambda node: max_length,
+                             paths_down.path, paths_up.path, lambda node: max_path])
 
     def queue_3(self):
         paths = find_all_critical_paths(self.task_dag, forward=True, weight_based=True)
         queue = QueueGenerationPolicy3().get_queue(self.task_dag)
         print(queue)
-        TableWindow(self.root, ["node", "Tcrit<down>", "Critical path"],
-                    [[node, paths[node][0], paths[node][1]] for node in queue],
-                    "Queue #3")
+        TableWindow(self.root, ["node", "Tcrit<down>", "Critical path"], queue, "Queue #3",
+                    columns=[str, paths.length, paths.path])
 
     def queue_4(self):
         paths = find_all_critical_paths(self.task_dag, forward=True, weight_based=False)
@@ -161,9 +179,8 @@ class UI:
 
         def get_connectivity(node_id):
             return len(self.task_dag.get_neighbours(self.task_dag.nodes[node_id], forward=True) + self.task_dag.get_neighbours(self.task_dag.nodes[node_id], forward=False))
-        TableWindow(self.root, ["node", "Ncrit<down>", "Connectivity", "Critical path"],
-                    [[node, paths[node][0], get_connectivity(node), paths[node][1]] for node in queue],
-                    "Queue #4")
+        TableWindow(self.root, ["node", "Ncrit<down>", "Connectivity", "Critical path"], queue, "Queue #4",
+                    columns=[str, paths.length, get_connectivity, paths.path])
 
     def queue_12(self):
         paths = find_all_critical_paths(self.task_dag, forward=True, weight_based=False)
@@ -171,16 +188,14 @@ class UI:
 
         def get_connectivity(node_id):
             return len(self.task_dag.get_neighbours(self.task_dag.nodes[node_id], forward=True))
-        TableWindow(self.root, ["node", "Outgoing Edges"],
-                    [[node, get_connectivity(node)] for node in queue],
-                    "Queue #12")
+        TableWindow(self.root, ["node", "Outgoing Edges"], queue, "Queue #12",
+                    columns=[str, get_connectivity])
 
     def queue_16(self):
         paths = find_all_critical_paths(self.task_dag, forward=False, weight_based=True)
         queue = QueueGenerationPolicy16().get_queue(self.task_dag)
-        TableWindow(self.root, ["node", "Tcrit<up>", "Critical path"],
-                    [[node, paths[node][0], paths[node][1]] for node in queue],
-                    "Queue #16")
+        TableWindow(self.root, ["node", "Tcrit<up>", "Critical path"], queue, "Queue #16",
+                    columns=[str, paths.length, paths.path])
 
     def schedule(self):
         SchedulerParamsWindow(self.root, self.task_dag, self.system_graph)
@@ -0,0 +1,78 @@
+from tkinter import *
+from tkinter import messagebox
+from tkinter.ttk import *
+from staticsched.ui.background import BackgroundJob
+from staticsched.ui.notification_consts import JOB_PROGRESS, JOB_DONE, JOB_CANCELED, JOB_FAILED
+from staticsched.ui.notifications import subscribe, unsubscribe_all
+
+
+class ProgressWindow:
+    """
+    Progress bar and cancel button of a BackgroundJob, on_done(result) is called
+    in the main loop once the job finishes
+    """
+    def __init__(self, root, job, title, on_done):
+        self.job = job
+        self.on_done = on_done
+        self.status = StringVar(value="working...")
+
+        self.root = Toplevel(root)
+        self.root.wm_title(title)
+        self.root.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.build()
+
+        subscribe(JOB_PROGRESS, self.on_progress, ns=job.ns)
+        subscribe(JOB_DONE, self.on_job_done, ns=job.ns)
+        subscribe(JOB_CANCELED, self.on_job_canceled, ns=job.ns)
+        subscribe(JOB_FAILED, self.on_job_failed, ns=job.ns)
+
+    def build(self):
+        self.frame = Frame(self.root)
+        self.frame.pack(fill='both', expand=True)
+
+        Label(self.frame, textvariable=self.status).pack(side=TOP)
+        # indeterminate until the first progress report
+        self.progress = Progressbar(self.frame, length=300, mode="indeterminate")
+        self.progress.pack(side=TOP)
+        self.progress.start()
+
+        self.cancel_button = Button(self.frame, text='cancel', command=self.cancel)
+        self.cancel_button.pack(side='right')
+
+    def on_progress(self, msg):
+        done, total = msg
+        if str(self.progress["mode"]) != "determinate":
+            self.progress.stop()
+            self.progress.configure(mode="determinate")
+        self.progress.configure(maximum=total, value=done)
+        self.status.set("{} / {}".format(done, total))
+
+    def cancel(self):
+        self.status.set("canceling...")
+        self.cancel_button.configure(state=DISABLED)
+        self.job.cancel()
+
+    def close(self):
+        unsubscribe_all(self, ns=self.job.ns)
+        self.root.destroy()
+
+    def on_job_done(self, result):
+        self.close()
+        self.on_done(result)
+
+    def on_job_canceled(self, msg):
+        self.close()
+
+    def on_job_failed(self, exception):
+        self.close()
+        messagebox.showerror("Error", str(exception))
+
+
+def run_in_background(root, title, work, on_done, on_cancel=None):
+    """
+    Runs work(report) in a BackgroundJob with a ProgressWindow, returns the job
+    """
+    job = BackgroundJob(root, work, on_cancel=on_cancel)
+    ProgressWindow(root, job, title, on_done)
+    job.start()
+    return job
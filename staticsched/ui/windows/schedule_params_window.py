@@ -2,12 +2,14 @@ from tkinter import *
 from tkinter.ttk import *
 from staticsched.graph_analytics.cpu_priorities import CohesionCPUPrioritizationPolicy
 from staticsched.graph_analytics.gantt import System
-from staticsched.graph_analytics.router import DFSRouter
+from staticsched.graph_analytics.router import BFSRouter
 from staticsched.graph_analytics.scheduler.schedulers import AdvanceNeighbourScheduler, \
     ModellingNeighbourScheduler
 from staticsched.graph_analytics.task_queues import QueueGenerationPolicy2, QueueGenerationPolicy3, \
     QueueGenerationPolicy12
+from staticsched.ui.background import snapshot
 from staticsched.ui.gantt_ui import draw_gantt_diagram
+from staticsched.ui.windows.progress_window import run_in_background
 
 
 def make_entry(parent, caption, var, widget=Entry, **options):
@@ -74,16 +76,26 @@ class SchedulerParamsWindow:
         cpu_prioritization_policy = CPU_PRIORITIZATION_POLICIES[self.cpu_prioritization_policy.get()]()
         scheduler_type = SCHEDULERS[self.scheduler_type.get()]
 
-        system = System(self.system_graph,
+        # the scheduler works on copies, the graphs may be edited while it runs
+        task_dag = snapshot(self.task_dag)
+        system_graph = snapshot(self.system_graph)
+        system = System(system_graph,
                         duplex=self.duplex.get(),
                         has_io_cpu=self.io_cpu.get())
         print(self.duplex.get(), self.io_cpu.get())
-        router = DFSRouter(self.system_graph)
+        router = BFSRouter(system_graph)
 
-        scheduler = scheduler_type(self.task_dag, self.system_graph,
+        scheduler = scheduler_type(task_dag, system_graph,
                                    queue_generation_policy,
                                    cpu_prioritization_policy,
                                    system,
-                                   router)
-        scheduler.schedule_dag()
-        draw_gantt_diagram(system)
+                                   router,
+                                   event_driven=True)
+
+        def work(report):
+            scheduler.progress = report
+            scheduler.schedule_dag()
+            return system
+
+        # cancel() stops the scheduler before the next task it tries
+        run_in_background(self.root, "Scheduling", work, draw_gantt_diagram, on_cancel=scheduler.cancel)
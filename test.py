@@ -1,22 +1,13 @@
 import json
 import warnings
-from staticsched.graph_analytics.cpu_priorities import CohesionCPUPrioritizationPolicy
-from staticsched.graph_analytics.gantt import System
 from staticsched.graph_analytics.raw_graph import Graph, DAG
-from staticsched.graph_analytics.router import DFSRouter
-from staticsched.graph_analytics.scheduler.schedulers import AdvanceNeighbourScheduler, ModellingNeighbourScheduler
-from staticsched.graph_analytics.task_queues import QueueGenerationPolicy3, QueueGenerationPolicy4, \
-    QueueGenerationPolicy16
+from staticsched.graph_analytics.scheduler.schedulers import ModellingNeighbourScheduler
+from staticsched.graph_analytics.system_template import SystemTemplate
+from staticsched.graph_analytics.task_queues import QueueGenerationPolicy3, QueueGenerationPolicy4
 
 
-def test(scale, connectivity, queue, scheduler_class, duplex, io_cpu, count=50):
-    system_graph = get_thor_system()
-    count = len(system_graph.nodes) * scale
-
-    system = System(system_graph,
-                    duplex=duplex,
-                    has_io_cpu=io_cpu)
-    router = DFSRouter(system_graph)
+def test(template, scale, connectivity, queue, scheduler_class, count=50):
+    count = len(template.graph.nodes) * scale
 
     k_accels = []
     k_efs = []
@@ -24,10 +15,9 @@ def test(scale, connectivity, queue, scheduler_class, duplex, io_cpu, count=50):
         task_dag = DAG.generate(min_weight=5, max_weight=20,
                                 count=count, connectivity=connectivity,
                                 connections_percent=30)
-        scheduler = scheduler_class(
-            task_dag, system_graph, queue(), CohesionCPUPrioritizationPolicy(),
-            system, router)
+        scheduler = template.scheduler(scheduler_class, task_dag, queue(), event_driven=True)
         scheduler.schedule_dag()
+        system = scheduler._system
         k_accel = task_dag.duration_on_one_cpu() / system.duration()
         k_accels.append(k_accel)
         k_ef = k_accel / len(system._cpus)
@@ -66,14 +56,14 @@ def loop(scale, queue, scheduler_class, duplex, io_cpu, count=50):
         print("no io_cpu; ", end='')
     print("scale %d:1" % scale)
 
+    template = SystemTemplate(get_thor_system(), duplex=duplex, has_io_cpu=io_cpu)
     connectivity = 0.1
     data = []
     while connectivity < 1:
         # print(">>", connectivity)
-        accel, ef = test(scale=scale, connectivity=connectivity,
+        accel, ef = test(template, scale=scale, connectivity=connectivity,
                          queue=queue,
                          scheduler_class=scheduler_class,
-                         duplex=duplex, io_cpu=io_cpu,
                          count=count)
         data.append("%s, %s" % (accel, ef))
 
@@ -93,10 +83,10 @@ def main():
          duplex=duplex, io_cpu=True)
     print("================")
 
-    # accel, ef = test(scale=scale, connectivity=0.7,
+    # accel, ef = test(SystemTemplate(get_thor_system(), duplex=duplex, has_io_cpu=True),
+    #                  scale=scale, connectivity=0.7,
     #                  queue=QueueGenerationPolicy3,
     #                  scheduler_class=scheduler_class,
-    #                  duplex=duplex, io_cpu=True,
     #                  count=1)
     #
 